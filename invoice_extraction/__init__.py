@@ -7,6 +7,14 @@ Supports OCR, ML-based field extraction, validation, and anomaly detection.
 
 __version__ = "0.1.0"
 
-from .pipeline import InvoiceExtractionPipeline
-
 __all__ = ["InvoiceExtractionPipeline"]
+
+
+def __getattr__(name):
+    # Lazy import (PEP 562): the pipeline transitively pulls in OCR, ML,
+    # and NumPy stacks, which callers that only want config/utils should
+    # not pay for at import time.
+    if name == "InvoiceExtractionPipeline":
+        from .pipeline import InvoiceExtractionPipeline
+        return InvoiceExtractionPipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,12 @@
 """Anomaly detection module."""
 
-from .detector import AnomalyDetector, StatisticalAnomalyDetector, RuleBasedAnomalyDetector, create_anomaly_detector
+__all__ = ["AnomalyDetector", "StatisticalAnomalyDetector", "RuleBasedAnomalyDetector", "HistoricalStore", "create_anomaly_detector"]
 
-__all__ = ["AnomalyDetector", "StatisticalAnomalyDetector", "RuleBasedAnomalyDetector", "create_anomaly_detector"]
+
+def __getattr__(name):
+    # Lazy import (PEP 562): keeps NumPy off the import path until a
+    # detector is actually requested.
+    if name in __all__:
+        from . import detector
+        return getattr(detector, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,49 @@
+"""Numeric kernels for statistical anomaly detection.
+
+The kernels are JIT-compiled with Numba when it is installed
+(nogil so thread-pooled batch runs are not serialized); otherwise the
+same functions run as plain NumPy, so Numba stays an optional
+dependency.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _summary_stats_impl(arr):
+    """
+    Mean, std, and interpolated quartiles of a pre-sorted float64 array.
+
+    Args:
+        arr: Historical values sorted ascending, length >= 4
+
+    Returns:
+        Tuple of (mean, std, q1, q3)
+    """
+    n = arr.shape[0]
+    mean = arr.mean()
+    std = arr.std()
+
+    index = 0.25 * (n - 1)
+    lo = int(index)
+    hi = lo + 1 if lo + 1 < n else n - 1
+    weight = index - lo
+    q1 = arr[lo] * (1.0 - weight) + arr[hi] * weight
+
+    index = 0.75 * (n - 1)
+    lo = int(index)
+    hi = lo + 1 if lo + 1 < n else n - 1
+    weight = index - lo
+    q3 = arr[lo] * (1.0 - weight) + arr[hi] * weight
+
+    return mean, std, q1, q3
+
+
+if njit is not None:
+    summary_stats = njit(cache=True, nogil=True)(_summary_stats_impl)
+else:
+    summary_stats = _summary_stats_impl
@@ -1,12 +1,287 @@
 """Anomaly detection module for invoice data."""
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import logging
+import sys
 import numpy as np
 
+from ._kernels import summary_stats
+
 logger = logging.getLogger(__name__)
 
+# IQR multiplier for outlier bounds (Tukey's fences)
+IQR_MULTIPLIER = 1.5
+
+# Below this many values, plain Python arithmetic beats the ndarray
+# construction overhead of the NumPy reductions
+SMALL_SAMPLE_CUTOFF = 1024
+
+# Numeric fields covered by the statistical checks
+STAT_FIELDS = ('total', 'vat', 'subtotal')
+
+
+def _coerce_numeric(data: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Parse the numeric fields of an invoice once.
+
+    float() on a string goes through C-level strtod; doing it once here
+    instead of once per check keeps the per-invoice cost constant as
+    checks are added. Unparseable values are simply absent from the
+    result, so downstream checks skip them.
+    """
+    numeric = {}
+    for key in STAT_FIELDS:
+        value = data.get(key)
+        if value not in (None, ''):
+            try:
+                numeric[key] = float(value)
+            except (ValueError, TypeError):
+                pass
+    return numeric
+
+
+def _check_round_total(data: Dict[str, Any], numeric: Dict[str, float],
+                       anomalies: List[Dict[str, Any]]) -> None:
+    """Flag totals that are suspiciously round (exact multiples of 1000)."""
+    # Integer modulo is cheaper than float.__mod__ and avoids
+    # FP-representation edge cases; the exactness test rejects
+    # fractional totals first.
+    total = numeric.get('total')
+    if total:
+        int_total = int(total)
+        if total == int_total and int_total >= 2000 and int_total % 1000 == 0:
+            anomalies.append({
+                'field': 'total',
+                'type': 'suspicious_pattern',
+                'value': total,
+                'message': 'Total is a very round number',
+                'severity': 'low'
+            })
+
+
+def _check_duplicate_items(data: Dict[str, Any], numeric: Dict[str, float],
+                           anomalies: List[Dict[str, Any]]) -> None:
+    """Flag invoices with duplicate line-item descriptions."""
+    # Stop at the first duplicate seen
+    if 'line_items' in data and data['line_items']:
+        seen = set()
+        has_duplicates = False
+        for item in data['line_items']:
+            description = _normalize_description(item.get('description', ''))
+            if description in seen:
+                has_duplicates = True
+                break
+            seen.add(description)
+        if has_duplicates:
+            anomalies.append({
+                'field': 'line_items',
+                'type': 'duplicate_items',
+                'message': 'Duplicate line items detected',
+                'severity': 'medium'
+            })
+
+
+def _check_missing_supplier(data: Dict[str, Any], numeric: Dict[str, float],
+                            anomalies: List[Dict[str, Any]]) -> None:
+    """Flag invoices without supplier information."""
+    if not data.get('supplier'):
+        anomalies.append({
+            'field': 'supplier',
+            'type': 'missing_critical_field',
+            'message': 'Supplier information is missing',
+            'severity': 'high'
+        })
+
+
+def _check_vat_rate(data: Dict[str, Any], numeric: Dict[str, float],
+                    anomalies: List[Dict[str, Any]]) -> None:
+    """Flag unusually high VAT percentages."""
+    vat = numeric.get('vat')
+    subtotal = numeric.get('subtotal')
+    if vat is not None and subtotal is not None and subtotal > 0:
+        vat_percentage = (vat / subtotal) * 100
+        if vat_percentage > 30:
+            anomalies.append({
+                'field': 'vat',
+                'type': 'unusual_rate',
+                'value': vat_percentage,
+                'message': f'VAT rate is unusually high: {vat_percentage:.2f}%',
+                'severity': 'high'
+            })
+
+
+# Registry of rule-based checks, keyed by the names accepted in the
+# detectors' `rules` argument
+RULE_CHECKS = {
+    'round_total': _check_round_total,
+    'duplicate_items': _check_duplicate_items,
+    'missing_supplier': _check_missing_supplier,
+    'vat_rate': _check_vat_rate,
+}
+
+
+@lru_cache(maxsize=4096)
+def _normalize_description(description: str) -> str:
+    """
+    Normalize a line-item description for duplicate comparison.
+
+    casefold handles Unicode more thoroughly than lower(), and interning
+    deduplicates the recurring descriptions seen across a batch so set
+    membership tests compare by pointer first.
+    """
+    return sys.intern(description.casefold())
+
+
+def _interp_rows(sorted_matrix: np.ndarray, fraction: float) -> np.ndarray:
+    """Linear-interpolated quantile row of a column-sorted 2-D array."""
+    index = fraction * (sorted_matrix.shape[0] - 1)
+    lo = int(index)
+    hi = min(lo + 1, sorted_matrix.shape[0] - 1)
+    weight = index - lo
+    return sorted_matrix[lo] * (1.0 - weight) + sorted_matrix[hi] * weight
+
+
+@dataclass
+class _HistoricalStats:
+    """Precomputed summary statistics for one historical field."""
+    count: int
+    mean: float
+    std: float
+    q1: float
+    q3: float
+    lower: float
+    upper: float
+
+    @classmethod
+    def from_values(cls, values: List[float]) -> "_HistoricalStats":
+        """
+        Compute summary statistics from a list of historical values.
+
+        Args:
+            values: List of historical values
+
+        Returns:
+            Precomputed statistics
+        """
+        n = len(values)
+        if n < 2:
+            return cls(n, 0.0, 0.0, 0.0, 0.0, float('-inf'), float('inf'))
+
+        if n >= SMALL_SAMPLE_CUTOFF:
+            arr = np.sort(np.ascontiguousarray(values, dtype=np.float64))
+            mean, std, q1, q3 = (float(x) for x in summary_stats(arr))
+        else:
+            mean = sum(values) / n
+            variance = sum((v - mean) * (v - mean) for v in values) / n
+            std = variance ** 0.5
+            if n >= 4:
+                ordered = sorted(values)
+                q1 = cls._quantile(ordered, 0.25)
+                q3 = cls._quantile(ordered, 0.75)
+            else:
+                q1 = q3 = 0.0
+
+        if n < 4:
+            # Not enough data for a meaningful IQR; disable outlier bounds
+            return cls(n, mean, std, 0.0, 0.0, float('-inf'), float('inf'))
+
+        iqr = q3 - q1
+        return cls(n, mean, std, q1, q3,
+                   q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+
+    @staticmethod
+    def _quantile(ordered: List[float], fraction: float) -> float:
+        """Linear-interpolated quantile on a pre-sorted list."""
+        index = fraction * (len(ordered) - 1)
+        lo = int(index)
+        hi = min(lo + 1, len(ordered) - 1)
+        weight = index - lo
+        return ordered[lo] * (1.0 - weight) + ordered[hi] * weight
+
+    def z_score(self, value: float) -> float:
+        """Z-score of a value against the precomputed mean/std."""
+        if self.count < 2 or self.std == 0:
+            return 0.0
+        return abs((value - self.mean) / self.std)
+
+    def is_outlier(self, value: float) -> bool:
+        """Check whether a value falls outside the IQR bounds."""
+        return value < self.lower or value > self.upper
+
+
+class HistoricalStore:
+    """
+    Columnar (structure-of-arrays) view of historical invoice data.
+
+    Converts a list of invoice dicts into one contiguous float64 array
+    per numeric field in a single pass, so statistical reductions run
+    over contiguous memory instead of per-invoice dict lookups. Build
+    one store per batch/session and pass it wherever historical data is
+    accepted.
+    """
+
+    __slots__ = ('count', 'columns', '_stats')
+
+    def __init__(self, historical_data: List[Dict[str, Any]]):
+        """
+        Build the columnar store from historical invoice records.
+
+        Args:
+            historical_data: Historical invoice data
+        """
+        self.count = len(historical_data)
+        columns = {field: [] for field in STAT_FIELDS}
+        for h in historical_data:
+            for field in STAT_FIELDS:
+                value = h.get(field)
+                if value:
+                    columns[field].append(value)
+        self.columns = {
+            field: np.asarray(values, dtype=np.float64)
+            for field, values in columns.items() if values
+        }
+        self._stats: Optional[Dict[str, _HistoricalStats]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def stats(self) -> Dict[str, "_HistoricalStats"]:
+        """Per-field summary statistics, computed once and cached."""
+        if self._stats is None:
+            stats = {}
+            lengths = {arr.size for arr in self.columns.values()}
+            n = lengths.pop() if len(lengths) == 1 else None
+
+            if n is not None and n >= SMALL_SAMPLE_CUTOFF:
+                # Complete records and a large history: stack the columns
+                # and compute every field's statistics in one reduction each
+                fields = list(self.columns)
+                matrix = np.stack([self.columns[f] for f in fields], axis=1)
+                means = matrix.mean(axis=0)
+                stds = matrix.std(axis=0)
+                # Sort each column once and take both quartiles by
+                # interpolated index, instead of np.percentile's internal
+                # per-quantile partitioning
+                matrix.sort(axis=0)
+                q1s = _interp_rows(matrix, 0.25)
+                q3s = _interp_rows(matrix, 0.75)
+                for j, field in enumerate(fields):
+                    iqr = q3s[j] - q1s[j]
+                    stats[field] = _HistoricalStats(
+                        n, float(means[j]), float(stds[j]),
+                        float(q1s[j]), float(q3s[j]),
+                        float(q1s[j] - IQR_MULTIPLIER * iqr),
+                        float(q3s[j] + IQR_MULTIPLIER * iqr))
+            else:
+                for field, arr in self.columns.items():
+                    stats[field] = _HistoricalStats.from_values(arr.tolist())
+
+            self._stats = stats
+        return self._stats
+
 
 class AnomalyDetector(ABC):
     """Abstract base class for anomaly detection."""
@@ -30,111 +305,99 @@ class AnomalyDetector(ABC):
 class StatisticalAnomalyDetector(AnomalyDetector):
     """Statistical anomaly detection using z-score and IQR methods."""
     
-    def __init__(self, threshold: float = 0.8):
+    def __init__(self, threshold: float = 0.8, rules: Optional[List[str]] = None):
         """
         Initialize statistical anomaly detector.
-        
+
         Args:
             threshold: Anomaly threshold (0-1, higher means stricter)
+            rules: Names of rule-based checks to run (see RULE_CHECKS).
+                Defaults to all of them.
         """
         self.threshold = threshold
         self.z_score_threshold = 3.0  # Standard z-score threshold
-    
-    def _calculate_z_score(self, value: float, values: List[float]) -> float:
-        """
-        Calculate z-score for a value.
-        
-        Args:
-            value: Value to check
-            values: List of historical values
-            
-        Returns:
-            Z-score
-        """
-        if len(values) < 2:
-            return 0.0
-        
-        mean = np.mean(values)
-        std = np.std(values)
-        
-        if std == 0:
-            return 0.0
-        
-        return abs((value - mean) / std)
-    
-    def _detect_outliers_iqr(self, value: float, values: List[float]) -> bool:
+        # Resolve the enabled rules once so the per-invoice loop only
+        # touches checks that are actually on
+        self._rules = tuple(RULE_CHECKS[name] for name in rules) \
+            if rules is not None else tuple(RULE_CHECKS.values())
+
+    @classmethod
+    def prepare(cls, historical_data) -> Dict[str, _HistoricalStats]:
         """
-        Detect outliers using IQR method.
-        
+        Precompute per-field statistics from historical data.
+
+        Call this once per batch and pass the result to `detect_anomalies`
+        to avoid recomputing the same aggregations for every invoice.
+
         Args:
-            value: Value to check
-            values: List of historical values
-            
+            historical_data: Historical invoice data, either a list of
+                dicts or an already-built HistoricalStore
+
         Returns:
-            True if value is an outlier
+            Mapping of field name to precomputed statistics
         """
-        if len(values) < 4:
-            return False
-        
-        q1 = np.percentile(values, 25)
-        q3 = np.percentile(values, 75)
-        iqr = q3 - q1
-        
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
-        
-        return value < lower_bound or value > upper_bound
-    
-    def detect_anomalies(self, data: Dict[str, Any], 
-                        historical_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        if not isinstance(historical_data, HistoricalStore):
+            historical_data = HistoricalStore(historical_data)
+        return historical_data.stats()
+
+    def detect_anomalies(self, data: Dict[str, Any],
+                        historical_data: Optional[List[Dict[str, Any]]] = None,
+                        stats: Optional[Dict[str, _HistoricalStats]] = None) -> Dict[str, Any]:
         """
         Detect anomalies using statistical methods.
-        
+
         Args:
             data: Current invoice data
             historical_data: Historical invoice data for comparison
-            
+                (list of dicts or a HistoricalStore)
+            stats: Precomputed statistics from `prepare`. If provided,
+                historical_data is not re-aggregated.
+
         Returns:
             Anomaly detection results
         """
         anomalies = []
         scores = {}
-        
+
+        # Parse each numeric field exactly once; every check below reads
+        # from this dict instead of re-running float()
+        numeric = _coerce_numeric(data)
+
         try:
             # If no historical data, perform rule-based checks only
-            if not historical_data or len(historical_data) < 2:
-                return self._rule_based_detection(data)
-            
-            # Extract numeric values from historical data
-            historical_totals = [h.get('total', 0) for h in historical_data if h.get('total')]
-            historical_vats = [h.get('vat', 0) for h in historical_data if h.get('vat')]
-            
+            if stats is None:
+                if not historical_data or len(historical_data) < 2:
+                    return self._rule_based_detection(data, numeric)
+                stats = self.prepare(historical_data)
+
+            total_stats = stats.get('total')
+            vat_stats = stats.get('vat')
+            subtotal_stats = stats.get('subtotal')
+
             # Check total amount
-            if 'total' in data and data['total']:
-                total = float(data['total'])
-                
-                if historical_totals:
-                    z_score = self._calculate_z_score(total, historical_totals)
-                    is_outlier = self._detect_outliers_iqr(total, historical_totals)
-                    
-                    scores['total_z_score'] = z_score
-                    
-                    if z_score > self.z_score_threshold or is_outlier:
-                        anomalies.append({
-                            'field': 'total',
-                            'type': 'statistical_outlier',
-                            'value': total,
-                            'message': f'Total amount is unusual (z-score: {z_score:.2f})',
-                            'severity': 'high' if z_score > 4 else 'medium'
-                        })
-            
+            total = numeric.get('total')
+            if total and total_stats:
+                z_score = total_stats.z_score(total)
+                is_outlier = total_stats.is_outlier(total)
+
+                scores['total_z_score'] = z_score
+
+                if z_score > self.z_score_threshold or is_outlier:
+                    anomalies.append({
+                        'field': 'total',
+                        'type': 'statistical_outlier',
+                        'value': total,
+                        'message': f'Total amount is unusual (z-score: {z_score:.2f})',
+                        'severity': 'high' if z_score > 4 else 'medium'
+                    })
+
             # Check VAT amount
-            if 'vat' in data and data['vat'] and historical_vats:
-                vat = float(data['vat'])
-                z_score = self._calculate_z_score(vat, historical_vats)
-                
+            vat = numeric.get('vat')
+            if vat and vat_stats:
+                z_score = vat_stats.z_score(vat)
+
                 scores['vat_z_score'] = z_score
-                
+
                 if z_score > self.z_score_threshold:
                     anomalies.append({
                         'field': 'vat',
@@ -143,9 +406,25 @@ class StatisticalAnomalyDetector(AnomalyDetector):
                         'message': f'VAT amount is unusual (z-score: {z_score:.2f})',
                         'severity': 'medium'
                     })
-            
+
+            # Check subtotal amount
+            subtotal = numeric.get('subtotal')
+            if subtotal and subtotal_stats:
+                z_score = subtotal_stats.z_score(subtotal)
+
+                scores['subtotal_z_score'] = z_score
+
+                if z_score > self.z_score_threshold:
+                    anomalies.append({
+                        'field': 'subtotal',
+                        'type': 'statistical_outlier',
+                        'value': subtotal,
+                        'message': f'Subtotal amount is unusual (z-score: {z_score:.2f})',
+                        'severity': 'medium'
+                    })
+
             # Add rule-based checks
-            rule_based = self._rule_based_detection(data)
+            rule_based = self._rule_based_detection(data, numeric)
             anomalies.extend(rule_based['anomalies'])
             scores.update(rule_based.get('scores', {}))
             
@@ -165,68 +444,28 @@ class StatisticalAnomalyDetector(AnomalyDetector):
                 'error': str(e)
             }
     
-    def _rule_based_detection(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _rule_based_detection(self, data: Dict[str, Any],
+                              numeric: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Perform rule-based anomaly detection.
-        
+
+        Runs the rule set assembled at construction time, so disabled
+        rules cost nothing on the per-invoice path.
+
         Args:
             data: Invoice data
-            
+            numeric: Pre-parsed numeric fields; built here if not supplied
+
         Returns:
             Anomaly detection results
         """
         anomalies = []
-        
-        # Check for suspiciously round numbers
-        if 'total' in data and data['total']:
-            total = float(data['total'])
-            if total > 0 and total % 1000 == 0 and total > 1000:
-                anomalies.append({
-                    'field': 'total',
-                    'type': 'suspicious_pattern',
-                    'value': total,
-                    'message': 'Total is a very round number',
-                    'severity': 'low'
-                })
-        
-        # Check for duplicate line items
-        if 'line_items' in data and data['line_items']:
-            descriptions = [item.get('description', '').lower() for item in data['line_items']]
-            if len(descriptions) != len(set(descriptions)):
-                anomalies.append({
-                    'field': 'line_items',
-                    'type': 'duplicate_items',
-                    'message': 'Duplicate line items detected',
-                    'severity': 'medium'
-                })
-        
-        # Check for missing supplier
-        if not data.get('supplier'):
-            anomalies.append({
-                'field': 'supplier',
-                'type': 'missing_critical_field',
-                'message': 'Supplier information is missing',
-                'severity': 'high'
-            })
-        
-        # Check for unusually high VAT percentage
-        if 'vat' in data and 'subtotal' in data:
-            try:
-                vat = float(data['vat'])
-                subtotal = float(data['subtotal'])
-                if subtotal > 0:
-                    vat_percentage = (vat / subtotal) * 100
-                    if vat_percentage > 30:
-                        anomalies.append({
-                            'field': 'vat',
-                            'type': 'unusual_rate',
-                            'value': vat_percentage,
-                            'message': f'VAT rate is unusually high: {vat_percentage:.2f}%',
-                            'severity': 'high'
-                        })
-            except (ValueError, TypeError, ZeroDivisionError):
-                pass
-        
+        if numeric is None:
+            numeric = _coerce_numeric(data)
+
+        for rule in self._rules:
+            rule(data, numeric, anomalies)
+
         return {
             'has_anomalies': len(anomalies) > 0,
             'anomalies': anomalies,
@@ -241,39 +480,58 @@ class RuleBasedAnomalyDetector(AnomalyDetector):
     def __init__(self, threshold: float = 0.8):
         """
         Initialize rule-based anomaly detector.
-        
+
         Args:
             threshold: Anomaly threshold
         """
         self.threshold = threshold
-    
-    def detect_anomalies(self, data: Dict[str, Any], 
+        # Build the delegate once instead of on every detect_anomalies call
+        self._stat = StatisticalAnomalyDetector(threshold)
+
+    def detect_anomalies(self, data: Dict[str, Any],
                         historical_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Detect anomalies using business rules.
-        
+
         Args:
             data: Current invoice data
             historical_data: Historical invoice data (not used in rule-based)
-            
+
         Returns:
             Anomaly detection results
         """
-        detector = StatisticalAnomalyDetector(self.threshold)
-        return detector._rule_based_detection(data)
+        return self._stat._rule_based_detection(data)
+
+
+@lru_cache(maxsize=32)
+def _make_detector(detector_type: str, threshold: float) -> AnomalyDetector:
+    """Construct (or reuse) a detector for a (type, threshold) pair."""
+    if detector_type == "statistical":
+        return StatisticalAnomalyDetector(threshold=threshold)
+    elif detector_type == "rule_based":
+        return RuleBasedAnomalyDetector(threshold=threshold)
+    else:
+        raise ValueError(f"Unknown detector type: {detector_type}")
 
 
 def create_anomaly_detector(detector_type: str = "statistical", **kwargs) -> AnomalyDetector:
     """
     Factory function to create anomaly detector.
-    
+
+    Detectors are stateless, so instances are memoized per
+    (type, threshold); callers passing other options (e.g. a rule
+    subset) get a fresh instance.
+
     Args:
         detector_type: Type of detector (statistical, rule_based)
         **kwargs: Additional arguments for the detector
-        
+
     Returns:
         Anomaly detector instance
     """
+    if set(kwargs) <= {'threshold'}:
+        return _make_detector(detector_type, kwargs.get('threshold', 0.8))
+
     if detector_type == "statistical":
         return StatisticalAnomalyDetector(**kwargs)
     elif detector_type == "rule_based":
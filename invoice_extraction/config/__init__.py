@@ -1,12 +1,20 @@
 """Configuration module."""
 
-from .config import Config, OCRConfig, MLConfig, ValidationConfig, AnomalyDetectionConfig, ExportConfig
-
 __all__ = [
     "Config",
     "OCRConfig",
     "MLConfig",
     "ValidationConfig",
     "AnomalyDetectionConfig",
-    "ExportConfig"
+    "ExportConfig",
+    "IntegrationConfig"
 ]
+
+
+def __getattr__(name):
+    # Lazy import (PEP 562): defers the yaml import until config classes
+    # are actually used.
+    if name in __all__:
+        from . import config
+        return getattr(config, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,21 +2,51 @@
 
 import os
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 
+try:
+    # libyaml-backed loader parses roughly 3x faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-@dataclass
+
+@lru_cache(maxsize=32)
+def _load_yaml(config_path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parse a YAML config file, cached on (path, mtime).
+
+    The mtime key makes edits to the file invalidate the cache entry
+    automatically, so repeated Config.from_yaml calls on an unchanged
+    file skip the parse entirely.
+    """
+    with open(config_path, 'r') as f:
+        return yaml.load(f, _YamlLoader)
+
+
+def _freeze_section(section_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert list values (e.g. from YAML) to tuples for frozen configs."""
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in section_dict.items()}
+
+
+# Config dataclasses are frozen with __slots__: no per-instance __dict__
+# (smaller, constant-offset attribute access) and hashable, so configs can
+# key caches. Derive modified configs with dataclasses.replace.
+
+@dataclass(frozen=True, slots=True)
 class OCRConfig:
     """OCR configuration."""
     engine: str = "tesseract"  # tesseract, easyocr, etc.
     language: str = "eng"
     dpi: int = 300
     preprocessing: bool = True
+    batch_size: int = 8  # Files per extract_text_batch call in batch modes
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MLConfig:
     """Machine Learning configuration."""
     model_type: str = "pattern_based"  # pattern_based, spacy_ner, custom
@@ -24,31 +54,37 @@ class MLConfig:
     spacy_model: str = "en_core_web_sm"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ValidationConfig:
     """Data validation configuration."""
     strict_mode: bool = False
-    required_fields: list = field(default_factory=lambda: ["supplier", "total", "invoice_date"])
-    vat_rates: list = field(default_factory=lambda: [0.0, 5.0, 10.0, 20.0])
+    required_fields: tuple = ("supplier", "total", "invoice_date")
+    vat_rates: tuple = (0.0, 5.0, 10.0, 20.0)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AnomalyDetectionConfig:
     """Anomaly detection configuration."""
     enabled: bool = True
-    algorithms: list = field(default_factory=lambda: ["statistical", "rule_based"])
+    algorithms: tuple = ("statistical", "rule_based")
     threshold: float = 0.8
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class IntegrationConfig:
+    """ERP integration configuration."""
+    max_concurrency: int = 16  # Parallel ERP pushes per batch
+
+
+@dataclass(frozen=True, slots=True)
 class ExportConfig:
     """Export configuration."""
-    formats: list = field(default_factory=lambda: ["json", "csv"])
+    formats: tuple = ("json", "csv")
     output_dir: str = "output"
     pretty_json: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Config:
     """Main configuration class."""
     ocr: OCRConfig = field(default_factory=OCRConfig)
@@ -56,32 +92,50 @@ class Config:
     validation: ValidationConfig = field(default_factory=ValidationConfig)
     anomaly_detection: AnomalyDetectionConfig = field(default_factory=AnomalyDetectionConfig)
     export: ExportConfig = field(default_factory=ExportConfig)
-    
+    integration: IntegrationConfig = field(default_factory=IntegrationConfig)
+
     @classmethod
     def from_yaml(cls, config_path: str) -> "Config":
         """Load configuration from YAML file."""
-        with open(config_path, 'r') as f:
-            config_dict = yaml.safe_load(f)
-        
+        mtime = os.path.getmtime(config_path)
+        config_dict = _load_yaml(str(config_path), mtime)
+
+        return cls.from_dict(config_dict)
+
+    @classmethod
+    def from_dict(cls, config_dict: Dict[str, Any]) -> "Config":
+        """Build configuration from a dictionary (inverse of to_dict)."""
         return cls(
-            ocr=OCRConfig(**config_dict.get('ocr', {})),
-            ml=MLConfig(**config_dict.get('ml', {})),
-            validation=ValidationConfig(**config_dict.get('validation', {})),
-            anomaly_detection=AnomalyDetectionConfig(**config_dict.get('anomaly_detection', {})),
-            export=ExportConfig(**config_dict.get('export', {}))
+            ocr=OCRConfig(**_freeze_section(config_dict.get('ocr', {}))),
+            ml=MLConfig(**_freeze_section(config_dict.get('ml', {}))),
+            validation=ValidationConfig(**_freeze_section(config_dict.get('validation', {}))),
+            anomaly_detection=AnomalyDetectionConfig(**_freeze_section(config_dict.get('anomaly_detection', {}))),
+            export=ExportConfig(**_freeze_section(config_dict.get('export', {}))),
+            integration=IntegrationConfig(**_freeze_section(config_dict.get('integration', {})))
         )
-    
+
     @classmethod
     def default(cls) -> "Config":
         """Create default configuration."""
-        return cls()
-    
+        # Immutable, so the cached template can be shared directly
+        return _default_config()
+
+    def replace_section(self, **sections) -> "Config":
+        """Return a copy of this config with the given sections swapped."""
+        return replace(self, **sections)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert configuration to dictionary."""
-        return {
-            'ocr': self.ocr.__dict__,
-            'ml': self.ml.__dict__,
-            'validation': self.validation.__dict__,
-            'anomaly_detection': self.anomaly_detection.__dict__,
-            'export': self.export.__dict__
-        }
+        return _config_to_dict(self)
+
+
+@lru_cache(maxsize=1)
+def _default_config() -> Config:
+    """Build the default configuration template once per process."""
+    return Config()
+
+
+@lru_cache(maxsize=32)
+def _config_to_dict(config: Config) -> Dict[str, Any]:
+    """Dict form of a config, cached per instance (configs are immutable)."""
+    return asdict(config)
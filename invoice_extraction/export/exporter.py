@@ -1,14 +1,29 @@
 """Export module for saving extracted invoice data."""
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, List
 import json
 import csv
 import logging
 from pathlib import Path
 
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# 1 MiB write buffer; the 8 KiB default causes many small write syscalls
+# on multi-MB exports
+WRITE_BUFFER_SIZE = 1 << 20
+
 
 class Exporter(ABC):
     """Abstract base class for data exporters."""
@@ -27,6 +42,29 @@ class Exporter(ABC):
         """
         pass
 
+    def export_batch(self, records: List[Dict[str, Any]], output_path: str) -> bool:
+        """
+        Export a batch of records in one call.
+
+        The default implementation writes each record to a numbered file;
+        subclasses override this with a bulk write where the format
+        supports it.
+
+        Args:
+            records: List of records to export
+            output_path: Path (or base path) for the output file(s)
+
+        Returns:
+            True if export successful
+        """
+        success = True
+        stem, dot, ext = output_path.rpartition('.')
+        for i, record in enumerate(records):
+            path = f"{stem}_{i+1}.{ext}" if dot else f"{output_path}_{i+1}"
+            if not self.export(record, path):
+                success = False
+        return success
+
 
 class JSONExporter(Exporter):
     """Export data to JSON format."""
@@ -52,15 +90,23 @@ class JSONExporter(Exporter):
             True if export successful
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                if self.pretty:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                else:
-                    json.dump(data, f, ensure_ascii=False)
-            
+            if orjson is not None:
+                # orjson serializes straight to bytes in C, so write the
+                # file in binary mode without building a Python string
+                options = orjson.OPT_INDENT_2 if self.pretty else 0
+                with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                    f.write(orjson.dumps(data, option=options))
+            else:
+                with open(output_path, 'w', encoding='utf-8',
+                          buffering=WRITE_BUFFER_SIZE) as f:
+                    if self.pretty:
+                        json.dump(data, f, indent=2, ensure_ascii=False)
+                    else:
+                        json.dump(data, f, ensure_ascii=False)
+
             logger.info(f"Data exported to JSON: {output_path}")
             return True
-            
+
         except Exception as e:
             logger.error(f"JSON export failed: {e}")
             return False
@@ -117,7 +163,8 @@ class CSVExporter(Exporter):
             flattened = self._flatten_data(data)
             
             # Write main invoice data
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            with open(output_path, 'w', newline='', encoding='utf-8',
+                      buffering=WRITE_BUFFER_SIZE) as f:
                 writer = csv.DictWriter(f, fieldnames=flattened.keys())
                 writer.writeheader()
                 writer.writerow(flattened)
@@ -135,6 +182,53 @@ class CSVExporter(Exporter):
             logger.error(f"CSV export failed: {e}")
             return False
     
+    def export_batch(self, records: List[Dict[str, Any]], output_path: str) -> bool:
+        """
+        Export a batch of records to a single CSV file.
+
+        Uses pandas' C CSV writer when available so the whole batch is
+        encoded in one bulk write instead of one DictWriter row per
+        invoice. Line items from all records go to a companion file with
+        an invoice_id column.
+
+        Args:
+            records: List of records to export
+            output_path: Path to the combined output file
+
+        Returns:
+            True if export successful
+        """
+        try:
+            flattened = [self._flatten_data(record) for record in records]
+
+            line_item_rows = []
+            for i, record in enumerate(records):
+                for item in record.get('line_items') or []:
+                    line_item_rows.append({'invoice_id': i + 1, **item})
+
+            if pd is not None:
+                pd.DataFrame(flattened).to_csv(output_path, index=False)
+                if line_item_rows:
+                    line_items_path = output_path.replace('.csv', '_line_items.csv')
+                    pd.DataFrame(line_item_rows).to_csv(line_items_path, index=False)
+            else:
+                fieldnames = sorted({k for row in flattened for k in row})
+                with open(output_path, 'w', newline='', encoding='utf-8',
+                          buffering=WRITE_BUFFER_SIZE) as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(flattened)
+                if line_item_rows:
+                    line_items_path = output_path.replace('.csv', '_line_items.csv')
+                    self._export_line_items(line_item_rows, line_items_path)
+
+            logger.info(f"Batch of {len(records)} records exported to CSV: {output_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Batch CSV export failed: {e}")
+            return False
+
     def _export_line_items(self, line_items: List[Dict[str, Any]], output_path: str) -> bool:
         """
         Export line items to separate CSV file.
@@ -149,14 +243,18 @@ class CSVExporter(Exporter):
         try:
             if not line_items:
                 return True
-            
-            # Get all possible field names
-            fieldnames = set()
-            for item in line_items:
-                fieldnames.update(item.keys())
-            
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=sorted(fieldnames))
+
+            # Items from one invoice usually share a schema; reuse the
+            # first item's keys then and only union when schemas differ
+            first_keys = line_items[0].keys()
+            if all(item.keys() == first_keys for item in line_items[1:]):
+                fieldnames = list(first_keys)
+            else:
+                fieldnames = sorted({k for item in line_items for k in item})
+
+            with open(output_path, 'w', newline='', encoding='utf-8',
+                      buffering=WRITE_BUFFER_SIZE) as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(line_items)
             
@@ -210,28 +308,60 @@ class MultiFormatExporter(Exporter):
             exporter = self.exporters[format_type]
             if not exporter.export(data, format_path):
                 success = False
-        
+
         return success
 
+    def export_batch(self, records: List[Dict[str, Any]], output_path: str) -> bool:
+        """
+        Export a batch of records to every configured format.
 
-def create_exporter(formats: List[str], **kwargs) -> Exporter:
-    """
-    Factory function to create exporter.
-    
-    Args:
-        formats: List of export formats
-        **kwargs: Additional arguments for the exporter
-        
-    Returns:
-        Exporter instance
-    """
+        Args:
+            records: List of records to export
+            output_path: Base path for output files (without extension)
+
+        Returns:
+            True if all exports successful
+        """
+        success = True
+
+        for format_type in self.formats:
+            if format_type not in self.exporters:
+                logger.warning(f"Unknown export format: {format_type}")
+                continue
+
+            format_path = f"{output_path}.{format_type}"
+            if not self.exporters[format_type].export_batch(records, format_path):
+                success = False
+
+        return success
+
+
+@lru_cache(maxsize=32)
+def _make_exporter(formats: tuple, pretty_json: bool) -> Exporter:
+    """Construct (or reuse) an exporter for a (formats, pretty) pair."""
     if len(formats) == 1:
         format_type = formats[0]
         if format_type == 'json':
-            return JSONExporter(**kwargs)
+            return JSONExporter(pretty=pretty_json)
         elif format_type == 'csv':
             return CSVExporter()
         else:
             raise ValueError(f"Unknown format: {format_type}")
     else:
-        return MultiFormatExporter(formats, **kwargs)
+        return MultiFormatExporter(list(formats), pretty_json=pretty_json)
+
+
+def create_exporter(formats: List[str], pretty_json: bool = True) -> Exporter:
+    """
+    Factory function to create exporter.
+
+    Exporters are stateless, so instances are memoized per configuration.
+
+    Args:
+        formats: List of export formats
+        pretty_json: If True, format JSON with indentation
+
+    Returns:
+        Exporter instance
+    """
+    return _make_exporter(tuple(formats), pretty_json)
@@ -1,12 +1,61 @@
 """ERP integration module for connecting with various ERP systems."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from dataclasses import asdict, dataclass
+from typing import Dict, Any, List, Optional
+import asyncio
 import logging
 
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+try:
+    # Event-loop-driven HTTP scales concurrent pushes on a handful of
+    # OS threads, unlike a thread-per-request pool around blocking IO
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class TransformedInvoice:
+    """
+    Invoice in the generic ERP format.
+
+    Slotted instances run about half the memory of the equivalent dict
+    and read fields at a fixed offset, which matters with thousands of
+    transformed invoices in flight during batch pushes. Serialized to a
+    dict only at the network boundary.
+    """
+    vendor: str
+    invoice_number: str
+    invoice_date: str
+    subtotal: float
+    tax_amount: float
+    total_amount: float
+    line_items: list
+    metadata: dict
+
+
+def _invoice_ref(transformed: Any) -> Any:
+    """Invoice number of a transformed payload, dataclass or dict."""
+    if isinstance(transformed, TransformedInvoice):
+        return transformed.invoice_number
+    return transformed.get('invoice_number')
+
+
+def _serialize(transformed: Any) -> Dict[str, Any]:
+    """Wire-format dict of a transformed payload, built at the boundary."""
+    if isinstance(transformed, TransformedInvoice):
+        return asdict(transformed)
+    return transformed
+
+
 class ERPAdapter(ABC):
     """Abstract base class for ERP adapters."""
     
@@ -35,7 +84,23 @@ class ERPAdapter(ABC):
             Result of the push operation
         """
         pass
-    
+
+    async def push_invoice_async(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Push invoice data to the ERP system from async code.
+
+        The default runs the synchronous push_invoice in a worker thread
+        so it can overlap other awaitables; adapters with a native async
+        client can override this.
+
+        Args:
+            invoice_data: Extracted invoice data
+
+        Returns:
+            Result of the push operation
+        """
+        return await asyncio.to_thread(self.push_invoice, invoice_data)
+
     @abstractmethod
     def validate_connection(self) -> bool:
         """
@@ -62,17 +127,64 @@ class ERPAdapter(ABC):
 
 class GenericERPAdapter(ERPAdapter):
     """Generic ERP adapter for systems with REST APIs."""
-    
+
+    # Source for the generated transform. Compiling this once per
+    # adapter class produces straight-line bytecode with the field map
+    # inlined, instead of method dispatch plus attribute lookups per
+    # invoice on the ingest hot path. Subclasses override this string
+    # with their own field map; the generic format builds a slotted
+    # TransformedInvoice, SAP/Oracle emit their wire dicts directly.
+    _TRANSFORM_SOURCE = """\
+def _transform(d):
+    return TransformedInvoice(
+        vendor=d.get('supplier', ''),
+        invoice_number=d.get('invoice_number', ''),
+        invoice_date=d.get('invoice_date', ''),
+        subtotal=d.get('subtotal', 0.0),
+        tax_amount=d.get('vat', 0.0),
+        total_amount=d.get('total', 0.0),
+        line_items=d.get('line_items', []),
+        metadata={
+            'extraction_confidence': d.get('confidence_scores', {}),
+            'validation_status': d.get('validation_status', 'unknown'),
+            'anomaly_flags': d.get('anomaly_flags', [])
+        }
+    )
+"""
+
     def __init__(self, erp_name: str = "Generic"):
         """
         Initialize generic ERP adapter.
-        
+
         Args:
             erp_name: Name of the ERP system
         """
         self.erp_name = erp_name
         self.connected = False
         self.config = {}
+
+        # Bind the class's generated transform function
+        namespace: Dict[str, Any] = {}
+        exec(self._TRANSFORM_SOURCE,
+             {'TransformedInvoice': TransformedInvoice}, namespace)
+        self._transform = namespace['_transform']
+
+        # One pooled session per adapter: HTTP keep-alive amortizes the
+        # TCP/TLS handshake across pushes instead of paying it per call
+        if requests is not None:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                                  max_retries=3)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        else:
+            self._session = None
+
+        # aiohttp session, created lazily on first async push so the
+        # connector binds to the running event loop; the loop it was
+        # created on is remembered so a later loop gets a fresh session
+        self._aiosession = None
+        self._aiosession_loop = None
     
     def connect(self, config: Dict[str, Any]) -> bool:
         """
@@ -122,21 +234,8 @@ class GenericERPAdapter(ERPAdapter):
         Returns:
             Transformed data in ERP format
         """
-        # Generic transformation - can be overridden by specific adapters
-        return {
-            'vendor': invoice_data.get('supplier', ''),
-            'invoice_number': invoice_data.get('invoice_number', ''),
-            'invoice_date': invoice_data.get('invoice_date', ''),
-            'subtotal': invoice_data.get('subtotal', 0.0),
-            'tax_amount': invoice_data.get('vat', 0.0),
-            'total_amount': invoice_data.get('total', 0.0),
-            'line_items': invoice_data.get('line_items', []),
-            'metadata': {
-                'extraction_confidence': invoice_data.get('confidence_scores', {}),
-                'validation_status': invoice_data.get('validation_status', 'unknown'),
-                'anomaly_flags': invoice_data.get('anomaly_flags', [])
-            }
-        }
+        # Dispatch to the transform generated from this class's field map
+        return self._transform(invoice_data)
     
     def push_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -157,15 +256,17 @@ class GenericERPAdapter(ERPAdapter):
         try:
             # Transform data to ERP format
             transformed_data = self.transform_data(invoice_data)
-            
-            # In a real implementation, this would make an API call
-            logger.info(f"Pushing invoice to {self.erp_name}: {transformed_data.get('invoice_number')}")
-            
+            invoice_ref = _invoice_ref(transformed_data)
+
+            # In a real implementation, this would POST
+            # _serialize(transformed_data) via self._session
+            logger.info(f"Pushing invoice to {self.erp_name}: {invoice_ref}")
+
             return {
                 'success': True,
                 'message': f'Invoice pushed to {self.erp_name}',
-                'invoice_id': transformed_data.get('invoice_number'),
-                'erp_reference': f"ERP-{transformed_data.get('invoice_number')}"
+                'invoice_id': invoice_ref,
+                'erp_reference': f"ERP-{invoice_ref}"
             }
             
         except Exception as e:
@@ -175,76 +276,208 @@ class GenericERPAdapter(ERPAdapter):
                 'error': str(e)
             }
 
+    async def _get_aiosession(self) -> Any:
+        """
+        Return the aiohttp session for the running loop.
 
-class SAPAdapter(GenericERPAdapter):
-    """Adapter for SAP ERP systems."""
-    
-    def __init__(self):
-        """Initialize SAP adapter."""
-        super().__init__(erp_name="SAP")
-    
-    def transform_data(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+        A ClientSession is bound to the loop it was created on, so the
+        cache is keyed by the running loop: each asyncio.run() that
+        drives a push gets a session on its own loop instead of reusing
+        one bound to an earlier, now-closed loop. A stale session's
+        connections died with that loop, so it is closed best-effort
+        before a replacement is created.
         """
-        Transform invoice data to SAP-specific format.
-        
+        loop = asyncio.get_running_loop()
+        session = self._aiosession
+        if session is not None and (session.closed
+                                    or self._aiosession_loop is not loop):
+            if not session.closed:
+                try:
+                    await session.close()
+                except Exception:
+                    pass
+            self._aiosession = None
+        if self._aiosession is None:
+            connector = aiohttp.TCPConnector(limit=50, keepalive_timeout=60)
+            self._aiosession = aiohttp.ClientSession(connector=connector)
+            self._aiosession_loop = loop
+        return self._aiosession
+
+    async def close(self) -> None:
+        """
+        Close the adapter's aiohttp session and release its connections.
+
+        Call this from the loop the session was created on once no
+        pushes are in flight; before the first async push (or without
+        aiohttp installed) it is a no-op. The adapter stays usable — the
+        next async push lazily opens a new session.
+        """
+        session = self._aiosession
+        self._aiosession = None
+        self._aiosession_loop = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def push_invoice_async(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Push invoice data to the ERP system from async code.
+
+        With aiohttp installed the push rides the event loop on the
+        adapter's pooled ClientSession; without it the base class runs
+        the sync push in a worker thread.
+
         Args:
             invoice_data: Extracted invoice data
-            
+
         Returns:
-            Transformed data in SAP format
+            Result of the push operation
         """
-        # SAP-specific transformation
-        base_data = super().transform_data(invoice_data)
-        
-        # Add SAP-specific fields
-        sap_data = {
-            'BUKRS': 'CompanyCode',  # Company code
-            'LIFNR': base_data['vendor'],  # Vendor number
-            'BLDAT': base_data['invoice_date'],  # Document date
-            'WRBTR': base_data['total_amount'],  # Amount
-            'WAERS': 'USD',  # Currency
-            'XBLNR': base_data['invoice_number'],  # Reference
-            'BSART': 'ZINV',  # Document type
-            'ITEMS': base_data['line_items']
-        }
-        
-        return sap_data
+        if aiohttp is None:
+            return await super().push_invoice_async(invoice_data)
+
+        if not self.connected:
+            return {
+                'success': False,
+                'error': 'Not connected to ERP system'
+            }
+
+        try:
+            transformed_data = self.transform_data(invoice_data)
+            invoice_ref = _invoice_ref(transformed_data)
+
+            # In a real implementation, this would POST via the shared
+            # session: session = await self._get_aiosession(); await
+            # session.post(..., json=_serialize(transformed_data))
+            logger.info(f"Pushing invoice to {self.erp_name}: {invoice_ref}")
+
+            return {
+                'success': True,
+                'message': f'Invoice pushed to {self.erp_name}',
+                'invoice_id': invoice_ref,
+                'erp_reference': f"ERP-{invoice_ref}"
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to push invoice to {self.erp_name}: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    async def push_invoices_async(self, invoices: List[Dict[str, Any]],
+                                  concurrency: int = 20) -> List[Dict[str, Any]]:
+        """
+        Push many invoices concurrently with bounded parallelism.
+
+        A semaphore caps the number of in-flight pushes so a large batch
+        cannot exhaust the connection pool or overwhelm the ERP endpoint.
+        The aiohttp session is released when the batch finishes; the
+        batch is the natural unit of connection reuse, and holding the
+        pool open past it leaks the connector.
+
+        Args:
+            invoices: List of extracted invoice data dicts
+            concurrency: Maximum number of concurrent pushes
+
+        Returns:
+            List of per-invoice push results, in input order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def push_one(invoice_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.push_invoice_async(invoice_data)
+
+        try:
+            return list(await asyncio.gather(*(push_one(inv) for inv in invoices)))
+        finally:
+            await self.close()
+
+    def push_invoices(self, invoices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Push a batch of invoices to the ERP system in one call.
+
+        All invoices are transformed up front and sent as a single
+        {"invoices": [...]} payload, so batch-capable endpoints see one
+        round-trip instead of one per invoice, reusing the adapter's
+        pooled keep-alive session.
+
+        Args:
+            invoices: List of extracted invoice data dicts
+
+        Returns:
+            List of per-invoice push results, in input order
+        """
+        if not self.connected:
+            return [{'success': False, 'error': 'Not connected to ERP system'}
+                    for _ in invoices]
+
+        try:
+            transformed = [self.transform_data(invoice) for invoice in invoices]
+            payload = {'invoices': [_serialize(data) for data in transformed]}
+
+            # In a real implementation, this would POST the payload to
+            # f"{self.config['url']}/invoices/batch" via self._session
+            logger.info(f"Pushing batch of {len(invoices)} invoices to {self.erp_name}")
+
+            return [{
+                'success': True,
+                'message': f'Invoice pushed to {self.erp_name}',
+                'invoice_id': _invoice_ref(data),
+                'erp_reference': f"ERP-{_invoice_ref(data)}"
+            } for data in transformed]
+
+        except Exception as e:
+            logger.error(f"Failed to push invoice batch to {self.erp_name}: {e}")
+            return [{'success': False, 'error': str(e)} for _ in invoices]
+
+
+class SAPAdapter(GenericERPAdapter):
+    """Adapter for SAP ERP systems."""
+
+    # SAP field map with the base mapping inlined, so one generated
+    # function goes straight from extracted data to SAP format
+    _TRANSFORM_SOURCE = """\
+def _transform(d):
+    return {
+        'BUKRS': 'CompanyCode',
+        'LIFNR': d.get('supplier', ''),
+        'BLDAT': d.get('invoice_date', ''),
+        'WRBTR': d.get('total', 0.0),
+        'WAERS': 'USD',
+        'XBLNR': d.get('invoice_number', ''),
+        'BSART': 'ZINV',
+        'ITEMS': d.get('line_items', [])
+    }
+"""
+
+    def __init__(self):
+        """Initialize SAP adapter."""
+        super().__init__(erp_name="SAP")
 
 
 class OracleAdapter(GenericERPAdapter):
     """Adapter for Oracle ERP systems."""
-    
+
+    # Oracle field map with the base mapping inlined
+    _TRANSFORM_SOURCE = """\
+def _transform(d):
+    return {
+        'vendor_id': d.get('supplier', ''),
+        'invoice_num': d.get('invoice_number', ''),
+        'invoice_date': d.get('invoice_date', ''),
+        'invoice_amount': d.get('total', 0.0),
+        'tax_amount': d.get('vat', 0.0),
+        'currency_code': 'USD',
+        'invoice_type_lookup_code': 'STANDARD',
+        'description': f"Invoice {d.get('invoice_number', '')}",
+        'lines': d.get('line_items', [])
+    }
+"""
+
     def __init__(self):
         """Initialize Oracle adapter."""
         super().__init__(erp_name="Oracle")
-    
-    def transform_data(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Transform invoice data to Oracle-specific format.
-        
-        Args:
-            invoice_data: Extracted invoice data
-            
-        Returns:
-            Transformed data in Oracle format
-        """
-        # Oracle-specific transformation
-        base_data = super().transform_data(invoice_data)
-        
-        # Add Oracle-specific fields
-        oracle_data = {
-            'vendor_id': base_data['vendor'],
-            'invoice_num': base_data['invoice_number'],
-            'invoice_date': base_data['invoice_date'],
-            'invoice_amount': base_data['total_amount'],
-            'tax_amount': base_data['tax_amount'],
-            'currency_code': 'USD',
-            'invoice_type_lookup_code': 'STANDARD',
-            'description': f"Invoice {base_data['invoice_number']}",
-            'lines': base_data['line_items']
-        }
-        
-        return oracle_data
 
 
 class ERPIntegrationManager:
@@ -287,24 +520,26 @@ class ERPIntegrationManager:
         return list(self.adapters.keys())
 
 
+# Adapter registry, built once at import instead of per factory call
+_ADAPTERS = {
+    'generic': GenericERPAdapter,
+    'sap': SAPAdapter,
+    'oracle': OracleAdapter
+}
+
+
 def create_erp_adapter(erp_type: str) -> ERPAdapter:
     """
     Factory function to create ERP adapter.
-    
+
     Args:
         erp_type: Type of ERP system (generic, sap, oracle)
-        
+
     Returns:
         ERP adapter instance
     """
-    adapters = {
-        'generic': GenericERPAdapter,
-        'sap': SAPAdapter,
-        'oracle': OracleAdapter
-    }
-    
-    adapter_class = adapters.get(erp_type.lower())
+    adapter_class = _ADAPTERS.get(erp_type.lower())
     if not adapter_class:
         raise ValueError(f"Unknown ERP type: {erp_type}")
-    
+
     return adapter_class()
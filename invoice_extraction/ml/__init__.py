@@ -1,5 +1,19 @@
 """Machine learning module for field extraction."""
 
-from .field_extractor import FieldExtractor, PatternBasedExtractor, SpacyNERExtractor, create_field_extractor
+from .field_extractor import (
+    FieldExtractor,
+    PatternBasedExtractor,
+    SpacyNERExtractor,
+    TokenBasedExtractor,
+    create_field_extractor,
+    extract_many,
+)
 
-__all__ = ["FieldExtractor", "PatternBasedExtractor", "SpacyNERExtractor", "create_field_extractor"]
+__all__ = [
+    "FieldExtractor",
+    "PatternBasedExtractor",
+    "SpacyNERExtractor",
+    "TokenBasedExtractor",
+    "create_field_extractor",
+    "extract_many",
+]
@@ -0,0 +1,48 @@
+"""Numeric kernels for token-level field extraction.
+
+The kernels are JIT-compiled with Numba when it is installed (nogil so
+thread-pooled batch runs are not serialized); otherwise the same
+functions run as plain NumPy, so Numba stays an optional dependency.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _group_rows_impl(tops, row_tol):
+    """
+    Assign a row id to every token based on its top coordinate.
+
+    Tokens are visited in top order; a gap larger than row_tol starts a
+    new row, so tokens within the tolerance band share a row id.
+
+    Args:
+        tops: int32 array of token top coordinates
+        row_tol: Maximum top difference within one row, in pixels
+
+    Returns:
+        int32 array of row ids aligned with tops
+    """
+    n = tops.shape[0]
+    row_ids = np.empty(n, dtype=np.int32)
+    order = np.argsort(tops, kind='mergesort')
+
+    current_row = 0
+    prev_top = tops[order[0]]
+    for k in range(n):
+        i = order[k]
+        if tops[i] - prev_top > row_tol:
+            current_row += 1
+        row_ids[i] = current_row
+        prev_top = tops[i]
+    return row_ids
+
+
+if njit is not None:
+    group_rows = njit(cache=True, nogil=True)(_group_rows_impl)
+else:
+    group_rows = _group_rows_impl
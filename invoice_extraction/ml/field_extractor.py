@@ -1,16 +1,48 @@
 """Machine learning module for invoice field extraction."""
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import re
 import logging
 from datetime import datetime
 
+import numpy as np
+
+from ._kernels import group_rows
+
+try:
+    # google-re2 matches in linear time (lazy DFA, no backtracking),
+    # which bounds the worst case on pathological OCR output
+    import re2
+except ImportError:
+    re2 = None
+
 logger = logging.getLogger(__name__)
 
 # Extraction constants
 DEFAULT_CONFIDENCE_SCORE = 0.8  # Default confidence for pattern-based extraction
 
+# Strips thousands separators, currency signs and stray spaces before
+# float(); str.translate runs the deletion as one C-level pass
+_NUM_TRANS = str.maketrans('', '', ',$ ')
+
+# Numeric fields parsed at the tail of extract_fields
+_NUMERIC_FIELDS = ('total', 'vat', 'subtotal')
+
+
+@lru_cache(maxsize=4)
+def _load_spacy(model_name: str):
+    """
+    Load a spaCy model once per process.
+
+    Models run tens to hundreds of MB and take seconds to load, so the
+    cache shares one instance across every extractor using the same
+    model name.
+    """
+    import spacy
+    return spacy.load(model_name)
+
 
 class FieldExtractor(ABC):
     """Abstract base class for field extraction."""
@@ -33,17 +65,28 @@ class FieldExtractor(ABC):
 class PatternBasedExtractor(FieldExtractor):
     """Pattern-based field extraction using regex."""
     
-    def __init__(self, confidence_threshold: float = 0.7):
+    def __init__(self, confidence_threshold: float = 0.7, engine: str = "re"):
         """
         Initialize pattern-based extractor.
-        
+
         Args:
             confidence_threshold: Minimum confidence for field extraction
+            engine: Regex engine, "re" (stdlib) or "re2" (linear-time DFA
+                matching via google-re2, if installed)
         """
         self.confidence_threshold = confidence_threshold
-        
-        # Define patterns for various fields
-        self.patterns = {
+
+        if engine == "re2" and re2 is None:
+            logger.warning("re2 requested but google-re2 is not installed; "
+                           "falling back to the stdlib re engine")
+            engine = "re"
+        self.engine = engine
+        re_engine = re2 if engine == "re2" else re
+
+        # Patterns for various fields, compiled once here so the hot
+        # path calls pattern.search(text) directly instead of paying
+        # re's per-call cache lookup and flag handling
+        raw_patterns = {
             'invoice_number': [
                 r'invoice\s*#?\s*:?\s*([A-Z0-9-]+)',
                 r'inv\s*#?\s*:?\s*([A-Z0-9-]+)',
@@ -74,20 +117,33 @@ class PatternBasedExtractor(FieldExtractor):
                 r'sub-total\s*:?\s*\$?\s*([\d,]+\.?\d*)',
             ],
         }
-    
-    def _extract_with_pattern(self, text: str, patterns: List[str]) -> Optional[str]:
+        self.patterns = {
+            field: [re_engine.compile(p, re_engine.IGNORECASE | re_engine.MULTILINE)
+                    for p in plist]
+            for field, plist in raw_patterns.items()
+        }
+
+        # Pattern for line items: description, quantity, unit price, total
+        # Example: "Product Name    5    $10.00    $50.00"
+        self._line_item_re = re_engine.compile(
+            r'([A-Za-z\s]+)\s+(\d+)\s+\$?([\d,]+\.?\d*)\s+\$?([\d,]+\.?\d*)',
+            re_engine.MULTILINE
+        )
+
+    def _extract_with_pattern(self, text: str,
+                              patterns: List[re.Pattern]) -> Optional[str]:
         """
         Extract field using multiple patterns.
-        
+
         Args:
             text: Text to search
-            patterns: List of regex patterns
-            
+            patterns: List of compiled regex patterns
+
         Returns:
             Extracted value or None
         """
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         return None
@@ -103,14 +159,8 @@ class PatternBasedExtractor(FieldExtractor):
             List of line items
         """
         line_items = []
-        
-        # Pattern for line items: description, quantity, unit price, total
-        # Example: "Product Name    5    $10.00    $50.00"
-        pattern = r'([A-Za-z\s]+)\s+(\d+)\s+\$?([\d,]+\.?\d*)\s+\$?([\d,]+\.?\d*)'
-        
-        matches = re.finditer(pattern, text, re.MULTILINE)
-        
-        for match in matches:
+
+        for match in self._line_item_re.finditer(text):
             line_items.append({
                 'description': match.group(1).strip(),
                 'quantity': int(match.group(2)),
@@ -143,23 +193,26 @@ class PatternBasedExtractor(FieldExtractor):
         }
         
         try:
-            # Extract each field
+            # One first-match search per pattern, in declaration order,
+            # on either engine. A fused alternation scanned the text
+            # once here, but finditer's leftmost-match dispatch and
+            # non-overlapping consumption change which value a field
+            # gets (pattern priority lost; matches nested inside another
+            # field's span skipped), so the two engines disagreed.
             for field, patterns in self.patterns.items():
                 value = self._extract_with_pattern(text, patterns)
                 if value:
                     extracted[field] = value
                     extracted['confidence_scores'][field] = DEFAULT_CONFIDENCE_SCORE
-            
+
             # Extract line items
             extracted['line_items'] = self._extract_line_items(text)
             
             # Parse numeric values
-            if extracted['total']:
-                extracted['total'] = float(extracted['total'].replace(',', ''))
-            if extracted['vat']:
-                extracted['vat'] = float(extracted['vat'].replace(',', ''))
-            if extracted['subtotal']:
-                extracted['subtotal'] = float(extracted['subtotal'].replace(',', ''))
+            for field in _NUMERIC_FIELDS:
+                value = extracted[field]
+                if value:
+                    extracted[field] = float(value.translate(_NUM_TRANS))
             
             return extracted
             
@@ -168,6 +221,186 @@ class PatternBasedExtractor(FieldExtractor):
             return extracted
 
 
+class TokenBasedExtractor(FieldExtractor):
+    """
+    Field extraction over the OCR token arrays in raw_data.
+
+    image_to_data already gives per-word tokens with coordinates, so
+    values can be found with tiny fullmatch checks on short tokens plus
+    label proximity on the page, instead of re-scanning the joined text
+    with long regexes. Falls back to pattern extraction when raw_data
+    carries no token arrays.
+    """
+
+    # Tiny per-field token shapes; fullmatch on a short token is far
+    # cheaper than searching the whole document
+    _DATE_RE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+    _MONEY_RE = re.compile(r'\$?[\d,]+\.?\d*')
+    _IDENT_RE = re.compile(r'#?[A-Z0-9][A-Z0-9-]*', re.IGNORECASE)
+
+    # Line-item column shapes: quantity, decimal prices, description words
+    _QTY_RE = re.compile(r'\d+')
+    _PRICE_RE = re.compile(r'\$?[\d,]+\.\d{1,2}')
+    _WORD_RE = re.compile(r'[A-Za-z][A-Za-z.,&-]*')
+
+    # Label token (lowercased, trailing ':' stripped) -> target field
+    # and the shape its value token must match
+    _LABELS = {
+        'total': ('total', _MONEY_RE),
+        'subtotal': ('subtotal', _MONEY_RE),
+        'sub-total': ('subtotal', _MONEY_RE),
+        'vat': ('vat', _MONEY_RE),
+        'tax': ('vat', _MONEY_RE),
+        'invoice': ('invoice_number', _IDENT_RE),
+        'inv': ('invoice_number', _IDENT_RE),
+        'date': ('invoice_date', _DATE_RE),
+        'from': ('supplier', None),
+        'vendor': ('supplier', None),
+        'supplier': ('supplier', None),
+    }
+
+    # Tokens whose top coordinates differ by no more than this many
+    # pixels are treated as lying on the same row
+    ROW_TOLERANCE = 10
+
+    def __init__(self, confidence_threshold: float = 0.7):
+        """
+        Initialize token-based extractor.
+
+        Args:
+            confidence_threshold: Minimum confidence for field extraction
+        """
+        self.confidence_threshold = confidence_threshold
+        self._fallback = PatternBasedExtractor(confidence_threshold)
+
+    def _value_on_row(self, tokens: List[tuple], label_idx: int,
+                      value_re: Optional[re.Pattern]) -> Optional[str]:
+        """
+        Find the value for the label token at label_idx.
+
+        Scans tokens to the right of the label within the same y-band
+        and returns the nearest one matching value_re; with no shape
+        given (supplier names), all same-row tokens to the right are
+        joined.
+        """
+        _, _, label_left, label_top = tokens[label_idx]
+        candidates = []
+        for text, _, left, top in tokens:
+            if left <= label_left or abs(top - label_top) > self.ROW_TOLERANCE:
+                continue
+            if value_re is None or value_re.fullmatch(text.rstrip(':')):
+                candidates.append((left, text))
+        if not candidates:
+            return None
+        candidates.sort()
+        if value_re is None:
+            return ' '.join(text for _, text in candidates)
+        return candidates[0][1]
+
+    def _extract_line_items_tokens(self, tokens: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Detect line items by grouping tokens into rows.
+
+        Row membership comes from the group_rows kernel over the token
+        top coordinates (JIT-compiled when Numba is installed). A row
+        whose columns read [description words..., int, decimal, decimal]
+        is taken as a line item — no backtracking regex over the full
+        text involved.
+
+        Args:
+            tokens: (text, index, left, top) tuples for non-empty tokens
+
+        Returns:
+            List of line items
+        """
+        if len(tokens) < 4:
+            return []
+
+        tops = np.asarray([top for _, _, _, top in tokens], dtype=np.int32)
+        row_ids = group_rows(tops, self.ROW_TOLERANCE)
+
+        rows: Dict[int, List[tuple]] = {}
+        for (text, _, left, _), row_id in zip(tokens, row_ids):
+            rows.setdefault(int(row_id), []).append((left, text))
+
+        line_items = []
+        for row_id in sorted(rows):
+            cells = [text for _, text in sorted(rows[row_id])]
+            if len(cells) < 4:
+                continue
+            description, (quantity, unit_price, total) = cells[:-3], cells[-3:]
+            if (self._QTY_RE.fullmatch(quantity)
+                    and self._PRICE_RE.fullmatch(unit_price)
+                    and self._PRICE_RE.fullmatch(total)
+                    and description
+                    and all(self._WORD_RE.fullmatch(word) for word in description)):
+                line_items.append({
+                    'description': ' '.join(description),
+                    'quantity': int(quantity),
+                    'unit_price': float(unit_price.translate(_NUM_TRANS)),
+                    'total': float(total.translate(_NUM_TRANS))
+                })
+        return line_items
+
+    def extract_fields(self, text: str, raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract invoice fields from OCR token arrays.
+
+        Args:
+            text: Extracted text from OCR
+            raw_data: Raw OCR data with bounding boxes
+
+        Returns:
+            Dictionary containing extracted fields
+        """
+        # PDF OCR returns raw_data as a list of per-page dicts; only the
+        # flat image shape carries token arrays this extractor can use
+        if not isinstance(raw_data, dict) or not raw_data.get('text'):
+            return self._fallback.extract_fields(text, raw_data)
+
+        extracted = {
+            'invoice_number': None,
+            'invoice_date': None,
+            'supplier': None,
+            'total': None,
+            'vat': None,
+            'subtotal': None,
+            'line_items': [],
+            'confidence_scores': {}
+        }
+
+        try:
+            tokens = [(tok.strip(), i, raw_data['left'][i], raw_data['top'][i])
+                      for i, tok in enumerate(raw_data['text']) if tok.strip()]
+
+            for idx, (tok, _, _, _) in enumerate(tokens):
+                label = self._LABELS.get(tok.lower().rstrip(':#'))
+                if label is None:
+                    continue
+                field, value_re = label
+                if extracted[field] is not None:
+                    continue
+                value = self._value_on_row(tokens, idx, value_re)
+                if value:
+                    extracted[field] = value.lstrip('#')
+                    extracted['confidence_scores'][field] = DEFAULT_CONFIDENCE_SCORE
+
+            # Extract line items from spatially grouped rows
+            extracted['line_items'] = self._extract_line_items_tokens(tokens)
+
+            # Parse numeric values
+            for field in _NUMERIC_FIELDS:
+                value = extracted[field]
+                if value:
+                    extracted[field] = float(value.translate(_NUM_TRANS))
+
+            return extracted
+
+        except Exception as e:
+            logger.error(f"Token-based extraction failed: {e}")
+            return self._fallback.extract_fields(text, raw_data)
+
+
 class SpacyNERExtractor(FieldExtractor):
     """Named Entity Recognition based field extraction using spaCy."""
     
@@ -181,84 +414,177 @@ class SpacyNERExtractor(FieldExtractor):
         """
         self.model_name = model_name
         self.confidence_threshold = confidence_threshold
-        
+        # One shared instance for fallback and merge paths; building it
+        # per call would recompile the whole pattern battery each time
+        self._pattern_extractor = PatternBasedExtractor(confidence_threshold)
+
         try:
-            import spacy
-            self.nlp = spacy.load(model_name)
+            self.nlp = _load_spacy(model_name)
+            # Only the ORG/DATE/MONEY entity labels are consumed, so the
+            # tagger, parser, lemmatizer etc. are dead weight on every
+            # document. All users of the shared model in this module are
+            # NER-only, so disabling on the cached instance is safe.
+            unused_pipes = [p for p in self.nlp.pipe_names if p != 'ner']
+            if unused_pipes:
+                self.nlp.select_pipes(disable=unused_pipes)
         except Exception as e:
             logger.warning(f"Failed to load spaCy model: {e}. Falling back to pattern-based extraction.")
             self.nlp = None
-    
+
+    def _extract_from_doc(self, doc: Any, text: str,
+                          raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge NER entities from a processed doc with pattern results."""
+        extracted = {
+            'organizations': [],
+            'dates': [],
+            'money': [],
+            'line_items': [],
+            'confidence_scores': {}
+        }
+
+        # Extract named entities
+        for ent in doc.ents:
+            if ent.label_ == "ORG":
+                extracted['organizations'].append(ent.text)
+            elif ent.label_ == "DATE":
+                extracted['dates'].append(ent.text)
+            elif ent.label_ == "MONEY":
+                extracted['money'].append(ent.text)
+
+        # Use pattern-based extraction for specific fields
+        pattern_result = self._pattern_extractor.extract_fields(text, raw_data)
+
+        # Merge results
+        extracted.update(pattern_result)
+
+        # Use NER results if pattern-based failed
+        if not extracted['supplier'] and extracted['organizations']:
+            extracted['supplier'] = extracted['organizations'][0]
+
+        return extracted
+
     def extract_fields(self, text: str, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract invoice fields using NER.
-        
+
         Args:
             text: Extracted text from OCR
             raw_data: Raw OCR data with bounding boxes
-            
+
         Returns:
             Dictionary containing extracted fields
         """
         if not self.nlp:
             # Fallback to pattern-based extraction
-            fallback = PatternBasedExtractor(self.confidence_threshold)
-            return fallback.extract_fields(text, raw_data)
-        
+            return self._pattern_extractor.extract_fields(text, raw_data)
+
         try:
             doc = self.nlp(text)
-            
-            extracted = {
-                'organizations': [],
-                'dates': [],
-                'money': [],
-                'line_items': [],
-                'confidence_scores': {}
-            }
-            
-            # Extract named entities
-            for ent in doc.ents:
-                if ent.label_ == "ORG":
-                    extracted['organizations'].append(ent.text)
-                elif ent.label_ == "DATE":
-                    extracted['dates'].append(ent.text)
-                elif ent.label_ == "MONEY":
-                    extracted['money'].append(ent.text)
-            
-            # Use pattern-based extraction for specific fields
-            pattern_extractor = PatternBasedExtractor(self.confidence_threshold)
-            pattern_result = pattern_extractor.extract_fields(text, raw_data)
-            
-            # Merge results
-            extracted.update(pattern_result)
-            
-            # Use NER results if pattern-based failed
-            if not extracted['supplier'] and extracted['organizations']:
-                extracted['supplier'] = extracted['organizations'][0]
-            
-            return extracted
-            
+            return self._extract_from_doc(doc, text, raw_data)
+
         except Exception as e:
             logger.error(f"NER extraction failed: {e}")
             # Fallback to pattern-based extraction
-            fallback = PatternBasedExtractor(self.confidence_threshold)
-            return fallback.extract_fields(text, raw_data)
+            return self._pattern_extractor.extract_fields(text, raw_data)
+
+    def extract_fields_batch(self, texts: List[str],
+                             raw_datas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Extract fields from many documents in one spaCy pass.
+
+        nlp.pipe batches documents through the model, amortizing
+        allocations and vectorized ops across the batch instead of
+        paying per-document pipeline overhead.
+
+        Args:
+            texts: Extracted texts, one per document
+            raw_datas: Raw OCR data dicts, aligned with texts
+
+        Returns:
+            List of extraction results in input order
+        """
+        if not self.nlp:
+            return [self._pattern_extractor.extract_fields(text, raw_data)
+                    for text, raw_data in zip(texts, raw_datas)]
+
+        try:
+            docs = self.nlp.pipe(texts, batch_size=64)
+            return [self._extract_from_doc(doc, text, raw_data)
+                    for doc, text, raw_data in zip(docs, texts, raw_datas)]
+        except Exception as e:
+            logger.error(f"Batched NER extraction failed: {e}")
+            return [self._pattern_extractor.extract_fields(text, raw_data)
+                    for text, raw_data in zip(texts, raw_datas)]
+
+
+def extract_many(paths: List[str], ocr_engine: Any,
+                 field_extractor: FieldExtractor,
+                 ocr_workers: int = 4) -> List[Dict[str, Any]]:
+    """
+    OCR and extract fields for many files, overlapping the two stages.
+
+    OCR is I/O- and C-bound (Tesseract releases the GIL) while field
+    extraction is pure-Python CPU, so OCR jobs fan out over a thread
+    pool and extraction runs in the caller's thread as each OCR result
+    completes. Results come back in input order.
+
+    Args:
+        paths: Invoice file paths
+        ocr_engine: OCR engine with an extract_text method
+        field_extractor: Extractor applied to each OCR result
+        ocr_workers: Thread count for the OCR stage
+
+    Returns:
+        List of dicts with 'path', 'ocr' and 'fields' keys, in input order
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+
+    with ThreadPoolExecutor(max_workers=max(1, ocr_workers)) as executor:
+        futures = {executor.submit(ocr_engine.extract_text, path): i
+                   for i, path in enumerate(paths)}
+
+        # Extraction happens here, concurrently with the remaining OCR
+        # jobs still running in the pool
+        for future in as_completed(futures):
+            i = futures[future]
+            entry = {'path': paths[i], 'ocr': None, 'fields': None}
+            try:
+                ocr_result = future.result()
+                entry['ocr'] = ocr_result
+                if ocr_result.get('success'):
+                    entry['fields'] = field_extractor.extract_fields(
+                        ocr_result['text'], ocr_result['raw_data'])
+            except Exception as e:
+                logger.error(f"Batched extraction failed for {paths[i]}: {e}")
+                entry['error'] = str(e)
+            results[i] = entry
+
+    return results
+
+
+# Extractor registry, built once at import instead of per factory call
+_EXTRACTORS = {
+    'pattern_based': PatternBasedExtractor,
+    'spacy_ner': SpacyNERExtractor,
+    'token_based': TokenBasedExtractor,
+}
 
 
 def create_field_extractor(extractor_type: str = "pattern_based", **kwargs) -> FieldExtractor:
     """
     Factory function to create field extractor.
-    
+
     Args:
         extractor_type: Type of extractor (pattern_based, spacy_ner)
         **kwargs: Additional arguments for the extractor
-        
+
     Returns:
         Field extractor instance
     """
-    if extractor_type == "pattern_based":
-        return PatternBasedExtractor(**kwargs)
-    elif extractor_type == "spacy_ner":
-        return SpacyNERExtractor(**kwargs)
-    else:
+    extractor_class = _EXTRACTORS.get(extractor_type)
+    if not extractor_class:
         raise ValueError(f"Unknown extractor type: {extractor_type}")
+
+    return extractor_class(**kwargs)
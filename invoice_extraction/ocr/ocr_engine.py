@@ -1,15 +1,84 @@
 """OCR interface and implementations for text extraction from invoices."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import hashlib
 import logging
+import os
+import tempfile
+import threading
+
+try:
+    # tesserocr binds the Tesseract C++ API in-process, so language data
+    # loads once per thread instead of fork+exec+model-load per call
+    import tesserocr
+except ImportError:
+    tesserocr = None
 
 logger = logging.getLogger(__name__)
 
+# Entries kept per engine in the content-addressed OCR result cache
+OCR_CACHE_SIZE = 128
+
+# Entries kept in the per-page cache of the PDF engine. Pages are
+# smaller than documents and boilerplate pages recur across a batch,
+# so this cache is deeper than the document-level one.
+PAGE_CACHE_SIZE = 1024
+
+
+def _hash_file(path: str) -> str:
+    """Content hash of a file, streamed in 1 MiB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _ResultCache:
+    """Small thread-safe LRU cache for OCR results."""
+
+    __slots__ = ('maxsize', '_data', '_lock')
+
+    def __init__(self, maxsize: int = OCR_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
 
 class OCREngine(ABC):
     """Abstract base class for OCR engines."""
-    
+
+    # Engines opt into content-addressed result caching by assigning a
+    # _ResultCache here (see use_cache constructor flags)
+    _cache: Optional[_ResultCache] = None
+
+    def _cache_key(self, path: str) -> Optional[str]:
+        """Content hash for caching, or None when caching is off."""
+        if self._cache is None:
+            return None
+        try:
+            return _hash_file(path)
+        except OSError as e:
+            logger.debug(f"Could not hash {path} for OCR cache: {e}")
+            return None
+
     @abstractmethod
     def extract_text(self, image_path: str) -> Dict[str, Any]:
         """
@@ -22,7 +91,49 @@ class OCREngine(ABC):
             Dictionary containing extracted text and metadata
         """
         pass
-    
+
+    def extract_text_batch(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extract text from several files in one call.
+
+        The default implementation iterates extract_text; engines whose
+        backend can amortize per-call overhead across a batch (threaded
+        recognition, batched inference) override this.
+
+        Args:
+            image_paths: Paths to the files to process
+
+        Returns:
+            One result dictionary per path, in input order
+        """
+        return [self.extract_text(path) for path in image_paths]
+
+    def extract_text_image(self, image: Any) -> Dict[str, Any]:
+        """
+        Extract text from an in-memory PIL image.
+
+        The default round-trips through a temporary file and the
+        path-based extract_text contract, so any conforming engine works
+        when driven page-by-page (e.g. by PDFOCREngine). Engines with a
+        native in-memory path override this to skip the disk hop.
+
+        Args:
+            image: PIL image to process
+
+        Returns:
+            Dictionary containing extracted text and metadata
+        """
+        fd, tmp_path = tempfile.mkstemp(suffix='.png')
+        os.close(fd)
+        try:
+            image.save(tmp_path, format='PNG')
+            return self.extract_text(tmp_path)
+        finally:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
     @abstractmethod
     def preprocess_image(self, image_path: str) -> Any:
         """
@@ -40,18 +151,27 @@ class OCREngine(ABC):
 class TesseractOCR(OCREngine):
     """Tesseract OCR implementation."""
     
-    def __init__(self, language: str = "eng", dpi: int = 300, preprocessing: bool = True):
+    def __init__(self, language: str = "eng", dpi: int = 300, preprocessing: bool = True,
+                 denoise_mode: str = "median", use_cache: bool = True):
         """
         Initialize Tesseract OCR engine.
-        
+
         Args:
             language: OCR language (default: eng)
             dpi: DPI for image processing
             preprocessing: Enable image preprocessing
+            denoise_mode: Denoising filter: "median" (cheap 3x3 median,
+                fine for printed invoices), "nlm" (non-local means, for
+                genuinely noisy scans) or "none"
+            use_cache: Reuse OCR results for files with identical content
+                (retries and webhook replays re-ingest the same bytes)
         """
         self.language = language
         self.dpi = dpi
         self.preprocessing = preprocessing
+        self.denoise_mode = denoise_mode
+        self.use_cache = use_cache
+        self._cache = _ResultCache() if use_cache else None
         self._libraries_loaded = False
         
         try:
@@ -67,6 +187,11 @@ class TesseractOCR(OCREngine):
         except ImportError as e:
             logger.warning(f"OCR libraries not installed: {e}. Install with: pip install pytesseract Pillow opencv-python")
             # Don't raise - allow graceful degradation
+
+        # PyTessBaseAPI handles are not thread-safe, so each pool thread
+        # gets its own via thread-local storage (see _get_api)
+        self._use_tesserocr = tesserocr is not None
+        self._tls = threading.local()
     
     def preprocess_image(self, image_path: str) -> Any:
         """
@@ -86,18 +211,217 @@ class TesseractOCR(OCREngine):
         
         # Read image
         img = self.cv2.imread(image_path)
-        
+
         # Convert to grayscale
         gray = self.cv2.cvtColor(img, self.cv2.COLOR_BGR2GRAY)
-        
+
         # Apply denoising
-        denoised = self.cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-        
+        denoised = self._denoise(gray)
+
         # Apply thresholding
         _, thresh = self.cv2.threshold(denoised, 0, 255, self.cv2.THRESH_BINARY + self.cv2.THRESH_OTSU)
-        
+
         return self.Image.fromarray(thresh)
-    
+
+    def _denoise(self, gray: Any) -> Any:
+        """
+        Apply the configured denoising filter to a grayscale array.
+
+        The 3x3 median filter is O(N) per pixel versus non-local means'
+        O(N x patch^2 x search^2) and gives comparable recognition
+        accuracy on printed invoices, so it is the default.
+        """
+        if self.denoise_mode == "median":
+            return self.cv2.medianBlur(gray, 3)
+        if self.denoise_mode == "nlm":
+            return self.cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+        return gray
+
+    def _get_api(self) -> Any:
+        """Return this thread's persistent PyTessBaseAPI handle."""
+        api = getattr(self._tls, 'api', None)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=self.language)
+            self._tls.api = api
+        return api
+
+    def _extract_with_api(self, image: Any) -> Dict[str, Any]:
+        """
+        Extract text from a preprocessed PIL image via the in-process
+        Tesseract API.
+
+        The persistent handle keeps the language model loaded across
+        images, so per-call cost is recognition only — no subprocess
+        fork and no model reload. The result iterator is walked into the
+        same dict shape pytesseract's image_to_data produces.
+
+        Args:
+            image: Preprocessed PIL image
+
+        Returns:
+            Dictionary containing extracted text and metadata
+        """
+        api = self._get_api()
+        api.SetImage(image)
+        text = api.GetUTF8Text().rstrip('\n')
+
+        data = {key: [] for key in ('block_num', 'par_num', 'line_num',
+                                    'word_num', 'left', 'top', 'width',
+                                    'height', 'conf', 'text')}
+        iterator = api.GetIterator()
+        if iterator is not None:
+            ril = tesserocr.RIL
+            block = par = line = word = 0
+            while True:
+                if iterator.IsAtBeginningOf(ril.BLOCK):
+                    block += 1
+                    par = 0
+                if iterator.IsAtBeginningOf(ril.PARA):
+                    par += 1
+                    line = 0
+                if iterator.IsAtBeginningOf(ril.TEXTLINE):
+                    line += 1
+                    word = 0
+                token = iterator.GetUTF8Text(ril.WORD)
+                if token:
+                    word += 1
+                    left, top, right, bottom = iterator.BoundingBox(ril.WORD)
+                    data['block_num'].append(block)
+                    data['par_num'].append(par)
+                    data['line_num'].append(line)
+                    data['word_num'].append(word)
+                    data['left'].append(left)
+                    data['top'].append(top)
+                    data['width'].append(right - left)
+                    data['height'].append(bottom - top)
+                    data['conf'].append(iterator.Confidence(ril.WORD))
+                    data['text'].append(token)
+                if not iterator.Next(ril.WORD):
+                    break
+
+        return {
+            'text': text,
+            'raw_data': data,
+            'success': True,
+            'engine': 'tesserocr'
+        }
+
+    @staticmethod
+    def _text_from_data(data: Dict[str, Any]) -> str:
+        """
+        Reconstruct plain text from an image_to_data dict.
+
+        Tokens are grouped into lines by (block_num, par_num, line_num),
+        words joined with spaces and lines with newlines — the same shape
+        image_to_string produces, without a second Tesseract run.
+
+        Args:
+            data: Output of image_to_data with Output.DICT
+
+        Returns:
+            Reconstructed page text
+        """
+        lines = []
+        current_key = None
+        current_words = None
+        for word, block, par, line in zip(data['text'], data['block_num'],
+                                          data['par_num'], data['line_num']):
+            if not word.strip():
+                continue
+            key = (block, par, line)
+            if key != current_key:
+                current_key = key
+                current_words = []
+                lines.append(current_words)
+            current_words.append(word)
+        return '\n'.join(' '.join(words) for words in lines)
+
+    def preprocess_pil(self, image: Any) -> Any:
+        """
+        Preprocess an in-memory PIL image for better OCR results.
+
+        Same pipeline as preprocess_image but without the disk
+        round-trip: the image is converted to a numpy array and the
+        cv2 steps run directly on the decoded pixels.
+
+        Args:
+            image: PIL image to preprocess
+
+        Returns:
+            Preprocessed image
+        """
+        if not self._libraries_loaded:
+            raise RuntimeError("OCR libraries not installed. Install with: pip install pytesseract Pillow opencv-python")
+
+        if not self.preprocessing:
+            return image
+
+        arr = self.np.asarray(image)
+
+        # Convert to grayscale (PIL arrays are RGB, not BGR)
+        if arr.ndim == 3:
+            gray = self.cv2.cvtColor(arr, self.cv2.COLOR_RGB2GRAY)
+        else:
+            gray = arr
+
+        # Apply denoising
+        denoised = self._denoise(gray)
+
+        # Apply thresholding
+        _, thresh = self.cv2.threshold(denoised, 0, 255, self.cv2.THRESH_BINARY + self.cv2.THRESH_OTSU)
+
+        return self.Image.fromarray(thresh)
+
+    def extract_text_image(self, image: Any) -> Dict[str, Any]:
+        """
+        Extract text from an in-memory PIL image using Tesseract.
+
+        Args:
+            image: PIL image to process
+
+        Returns:
+            Dictionary containing extracted text and metadata
+        """
+        if not self._libraries_loaded:
+            error_msg = 'OCR libraries not installed. Install with: pip install pytesseract Pillow opencv-python'
+            logger.error(error_msg)
+            return {
+                'text': '',
+                'raw_data': {},
+                'success': False,
+                'error': error_msg,
+                'engine': 'tesseract'
+            }
+
+        try:
+            # Preprocess image without touching disk
+            image = self.preprocess_pil(image)
+
+            if self._use_tesserocr:
+                return self._extract_with_api(image)
+
+            # One Tesseract run: image_to_data carries the recognized
+            # words, so the plain text is rebuilt from it instead of a
+            # second image_to_string pass
+            data = self.pytesseract.image_to_data(image, lang=self.language, output_type=self.pytesseract.Output.DICT)
+            text = self._text_from_data(data)
+
+            return {
+                'text': text,
+                'raw_data': data,
+                'success': True,
+                'engine': 'tesseract'
+            }
+        except Exception as e:
+            logger.error(f"OCR extraction failed: {e}")
+            return {
+                'text': '',
+                'raw_data': {},
+                'success': False,
+                'error': str(e),
+                'engine': 'tesseract'
+            }
+
     def extract_text(self, image_path: str) -> Dict[str, Any]:
         """
         Extract text from an image using Tesseract.
@@ -120,21 +444,33 @@ class TesseractOCR(OCREngine):
             }
         
         try:
+            # Reuse a previous run when the file content is identical
+            cache_key = self._cache_key(image_path)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
             # Preprocess image
             image = self.preprocess_image(image_path)
-            
-            # Extract text
-            text = self.pytesseract.image_to_string(image, lang=self.language)
-            
-            # Extract detailed data with bounding boxes
-            data = self.pytesseract.image_to_data(image, lang=self.language, output_type=self.pytesseract.Output.DICT)
-            
-            return {
-                'text': text,
-                'raw_data': data,
-                'success': True,
-                'engine': 'tesseract'
-            }
+
+            if self._use_tesserocr:
+                result = self._extract_with_api(image)
+            else:
+                # One Tesseract run: image_to_data carries the recognized
+                # words, so the plain text is rebuilt from it instead of
+                # a second image_to_string pass
+                data = self.pytesseract.image_to_data(image, lang=self.language, output_type=self.pytesseract.Output.DICT)
+                result = {
+                    'text': self._text_from_data(data),
+                    'raw_data': data,
+                    'success': True,
+                    'engine': 'tesseract'
+                }
+
+            if cache_key is not None:
+                self._cache.put(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"OCR extraction failed: {e}")
             return {
@@ -145,21 +481,53 @@ class TesseractOCR(OCREngine):
                 'engine': 'tesseract'
             }
 
+    def extract_text_batch(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extract text from several images, fanned out across threads.
+
+        Tesseract releases the GIL during recognition, so concurrent
+        extract_text calls scale across cores; cache hits are still
+        served per file inside extract_text.
+
+        Args:
+            image_paths: Paths to the image files
+
+        Returns:
+            One result dictionary per path, in input order
+        """
+        if len(image_paths) <= 1:
+            return [self.extract_text(path) for path in image_paths]
+        workers = min(os.cpu_count() or 1, len(image_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.extract_text, image_paths))
+
 
 class PDFOCREngine(OCREngine):
     """OCR engine for PDF documents."""
     
-    def __init__(self, ocr_engine: OCREngine, dpi: int = 300):
+    def __init__(self, ocr_engine: OCREngine, dpi: int = 300,
+                 max_workers: Optional[int] = None, use_cache: bool = True):
         """
         Initialize PDF OCR engine.
-        
+
         Args:
             ocr_engine: Underlying OCR engine to use
             dpi: DPI for PDF to image conversion
+            max_workers: Thread count for per-page OCR. Tesseract runs in
+                C and releases the GIL, so pages scale across cores.
+                Defaults to the CPU count.
+            use_cache: Reuse OCR results for PDFs with identical content
         """
         self.ocr_engine = ocr_engine
         self.dpi = dpi
-        
+        self.max_workers = max_workers or (os.cpu_count() or 1)
+        self.use_cache = use_cache
+        self._cache = _ResultCache() if use_cache else None
+        # Multi-page invoices share boilerplate (headers, T&C pages)
+        # across documents; caching per rendered page lets those pages
+        # skip Tesseract even when the documents differ
+        self._page_cache = _ResultCache(maxsize=PAGE_CACHE_SIZE) if use_cache else None
+
         try:
             from pdf2image import convert_from_path
             self.convert_from_path = convert_from_path
@@ -170,7 +538,36 @@ class PDFOCREngine(OCREngine):
     def preprocess_image(self, image_path: str) -> Any:
         """Use underlying OCR engine's preprocessing."""
         return self.ocr_engine.preprocess_image(image_path)
-    
+
+    def _extract_page(self, image: Any) -> Dict[str, Any]:
+        """
+        OCR one rendered page, served from the page cache when the same
+        pixels were recognized before (identical boilerplate pages recur
+        across documents in a batch).
+
+        Args:
+            image: Rendered PIL page image
+
+        Returns:
+            Dictionary containing extracted text and metadata
+        """
+        key = None
+        if self._page_cache is not None:
+            try:
+                key = hashlib.blake2b(image.tobytes(),
+                                      digest_size=16).hexdigest()
+            except Exception as e:
+                logger.debug(f"Could not hash page for OCR cache: {e}")
+            if key is not None:
+                cached = self._page_cache.get(key)
+                if cached is not None:
+                    return cached
+
+        result = self.ocr_engine.extract_text_image(image)
+        if key is not None and result['success']:
+            self._page_cache.put(key, result)
+        return result
+
     def extract_text(self, pdf_path: str) -> Dict[str, Any]:
         """
         Extract text from a PDF document.
@@ -182,40 +579,55 @@ class PDFOCREngine(OCREngine):
             Dictionary containing extracted text and metadata
         """
         try:
-            import tempfile
-            import os
-            
-            # Convert PDF to images
-            images = self.convert_from_path(pdf_path, dpi=self.dpi)
-            
+            # Reuse a previous run when the file content is identical
+            cache_key = self._cache_key(pdf_path)
+            if cache_key is not None:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            # Convert PDF to images. fmt='ppm' keeps pages as raw
+            # uncompressed buffers (no PNG/JPEG compressor pass on the
+            # poppler side), and thread_count lets poppler rasterize
+            # pages on all cores.
+            images = self.convert_from_path(pdf_path, dpi=self.dpi,
+                                            fmt='ppm',
+                                            thread_count=os.cpu_count() or 1)
+
             all_text = []
             all_data = []
+
+            # OCR each page in memory. Pages are independent and the
+            # Tesseract call releases the GIL, so multi-page documents
+            # fan out over a thread pool; executor.map preserves page
+            # order in its results.
+            if len(images) > 1 and self.max_workers > 1:
+                with ThreadPoolExecutor(
+                        max_workers=min(self.max_workers, len(images))) as executor:
+                    page_results = list(executor.map(
+                        self._extract_page, images))
+            else:
+                page_results = [self._extract_page(image)
+                                for image in images]
+
+            for i, result in enumerate(page_results):
+                if result['success']:
+                    all_text.append(f"--- Page {i+1} ---\n{result['text']}")
+                    all_data.append({
+                        'page': i + 1,
+                        'data': result['raw_data']
+                    })
             
-            # Create temporary directory for page images
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Process each page
-                for i, image in enumerate(images):
-                    # Save temporary image
-                    temp_path = os.path.join(temp_dir, f"page_{i}.png")
-                    image.save(temp_path, 'PNG')
-                    
-                    # Extract text from image
-                    result = self.ocr_engine.extract_text(temp_path)
-                    
-                    if result['success']:
-                        all_text.append(f"--- Page {i+1} ---\n{result['text']}")
-                        all_data.append({
-                            'page': i + 1,
-                            'data': result['raw_data']
-                        })
-            
-            return {
+            result = {
                 'text': '\n\n'.join(all_text),
                 'raw_data': all_data,
                 'success': True,
                 'pages': len(images),
                 'engine': f'pdf_{self.ocr_engine.__class__.__name__}'
             }
+            if cache_key is not None:
+                self._cache.put(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"PDF OCR extraction failed: {e}")
             return {
@@ -238,10 +650,22 @@ def create_ocr_engine(engine_type: str = "tesseract", **kwargs) -> OCREngine:
     Returns:
         OCR engine instance
     """
-    if engine_type == "tesseract":
-        return TesseractOCR(**kwargs)
-    elif engine_type == "pdf":
-        base_engine = TesseractOCR(**kwargs)
-        return PDFOCREngine(base_engine, dpi=kwargs.get('dpi', 300))
-    else:
+    builder = _ENGINES.get(engine_type)
+    if builder is None:
         raise ValueError(f"Unknown OCR engine type: {engine_type}")
+    return builder(**kwargs)
+
+
+def _build_pdf_engine(**kwargs) -> "PDFOCREngine":
+    """Build a PDF engine wrapping a Tesseract base engine."""
+    max_workers = kwargs.pop('max_workers', None)
+    base_engine = TesseractOCR(**kwargs)
+    return PDFOCREngine(base_engine, dpi=kwargs.get('dpi', 300),
+                        max_workers=max_workers)
+
+
+# Engine registry, built once at import instead of per factory call
+_ENGINES = {
+    'tesseract': TesseractOCR,
+    'pdf': _build_pdf_engine,
+}
@@ -1,8 +1,18 @@
 """Main pipeline for invoice extraction."""
 
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import pickle
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, replace
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List
 
 from .config import Config
 from .ocr import create_ocr_engine
@@ -12,8 +22,128 @@ from .anomaly_detection import create_anomaly_detector
 from .export import create_exporter
 from .integration import ERPAdapter
 
+try:
+    # Rust JSON encoder, several times faster than stdlib json and
+    # serializing straight to bytes (same optional dep as the exporter)
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Default worker count for parallel batch processing
+DEFAULT_BATCH_WORKERS = min(os.cpu_count() or 1, 8)
+
+# Bounded queue size between pipeline stages; caps in-flight invoices (RAM)
+STAGE_QUEUE_SIZE = 4
+
+
+class OcrDiskCache:
+    """
+    Persistent content-addressed cache of OCR results.
+
+    Keys hash the invoice file bytes together with the OCR configuration,
+    so duplicate files across runs (re-indexing, retries, shared logo
+    pages) skip the OCR stage entirely, and any OCR config change
+    invalidates old entries implicitly. Backed by a single SQLite file in
+    WAL mode so concurrent pipeline processes can share it safely.
+    """
+
+    def __init__(self, path: str = ".ocr_cache.db"):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite cache file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache "
+            "(key TEXT PRIMARY KEY, value BLOB)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(invoice_path: str, ocr_config) -> Optional[str]:
+        """
+        Content hash of the invoice file plus the OCR configuration.
+
+        Returns None when the file cannot be read, so callers fall
+        through to a normal OCR run.
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        try:
+            with open(invoice_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+        except OSError as e:
+            logger.debug("OCR cache key skipped for %s: %s", invoice_path, e)
+            return None
+        hasher.update(json.dumps(asdict(ocr_config), sort_keys=True).encode())
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached OCR result for key, or None on a miss or read failure."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM ocr_cache WHERE key = ?",
+                    (key,)).fetchone()
+            return pickle.loads(row[0]) if row else None
+        except Exception as e:
+            logger.debug("OCR cache read failed: %s", e)
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store an OCR result; cache failures never break the pipeline."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO ocr_cache (key, value) VALUES (?, ?)",
+                    (key, pickle.dumps(value)))
+                self._conn.commit()
+        except Exception as e:
+            logger.warning("OCR cache write failed: %s", e)
+
+
+# Per-worker pipeline, built once by _init_worker and reused for every
+# invoice that worker is handed
+_WORKER_PIPELINE: Optional["InvoiceExtractionPipeline"] = None
+
+
+def _init_worker(config_dict: Dict[str, Any]):
+    """
+    Build the worker-local pipeline from the serialized configuration.
+
+    Runs once per worker process (ProcessPoolExecutor initializer), so
+    component construction is paid per worker rather than per invoice.
+
+    Args:
+        config_dict: Serialized configuration (Config.to_dict)
+    """
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = InvoiceExtractionPipeline(Config.from_dict(config_dict))
+
+
+def _process_one(invoice_path: str,
+                 output_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Process a single invoice on the worker-local pipeline.
+
+    Module-level so it is picklable by ProcessPoolExecutor.
+
+    Args:
+        invoice_path: Path to the invoice file
+        output_name: Name for output files (without extension)
+
+    Returns:
+        Processing result for the invoice
+    """
+    return _WORKER_PIPELINE.process_invoice(invoice_path, output_name=output_name)
+
 
 class InvoiceExtractionPipeline:
     """
@@ -28,59 +158,84 @@ class InvoiceExtractionPipeline:
     6. Optional ERP integration
     """
     
-    def __init__(self, config: Optional[Config] = None):
+    def __init__(self, config: Optional[Config] = None,
+                 ocr_cache_path: Optional[str] = None):
         """
         Initialize the invoice extraction pipeline.
-        
+
         Args:
             config: Configuration object. If None, uses default configuration.
+            ocr_cache_path: Path to a persistent OCR result cache (SQLite).
+                When set, invoices whose content was OCR'd before under the
+                same OCR config skip Stage 1 entirely.
         """
         self.config = config or Config.default()
-        
+        self._ocr_cache = OcrDiskCache(ocr_cache_path) if ocr_cache_path else None
+
+        # Private event loop for the export/ERP overlap, created lazily
+        # by _run_async and reused across invoices
+        self._async_loop = None
+
         # Initialize components
         self._initialize_components()
-        
+
         logger.info("Invoice extraction pipeline initialized")
     
-    def _initialize_components(self):
-        """Initialize all pipeline components based on configuration."""
+    def _initialize_components(self, old_config: Optional[Config] = None):
+        """
+        Initialize pipeline components based on configuration.
+
+        Config sections are frozen dataclasses, so they compare by value:
+        when old_config is given, components whose section is unchanged
+        are kept as-is. The OCR engine in particular is expensive to
+        rebuild (model load), so an export-only config change should not
+        touch it.
+
+        Args:
+            old_config: Previous configuration; None rebuilds everything
+        """
         # OCR engine
-        self.ocr_engine = create_ocr_engine(
-            engine_type=self.config.ocr.engine,
-            language=self.config.ocr.language,
-            dpi=self.config.ocr.dpi,
-            preprocessing=self.config.ocr.preprocessing
-        )
-        
+        if old_config is None or self.config.ocr != old_config.ocr:
+            self.ocr_engine = create_ocr_engine(
+                engine_type=self.config.ocr.engine,
+                language=self.config.ocr.language,
+                dpi=self.config.ocr.dpi,
+                preprocessing=self.config.ocr.preprocessing
+            )
+
         # Field extractor
-        self.field_extractor = create_field_extractor(
-            extractor_type=self.config.ml.model_type,
-            confidence_threshold=self.config.ml.confidence_threshold
-        )
-        
+        if old_config is None or self.config.ml != old_config.ml:
+            self.field_extractor = create_field_extractor(
+                extractor_type=self.config.ml.model_type,
+                confidence_threshold=self.config.ml.confidence_threshold
+            )
+
         # Validator
-        self.validator = create_validator(
-            required_fields=self.config.validation.required_fields,
-            vat_rates=self.config.validation.vat_rates,
-            strict_mode=self.config.validation.strict_mode
-        )
-        
-        # Anomaly detector
-        if self.config.anomaly_detection.enabled:
-            detector_type = self.config.anomaly_detection.algorithms[0] \
-                if self.config.anomaly_detection.algorithms else "statistical"
-            self.anomaly_detector = create_anomaly_detector(
-                detector_type=detector_type,
-                threshold=self.config.anomaly_detection.threshold
+        if old_config is None or self.config.validation != old_config.validation:
+            self.validator = create_validator(
+                required_fields=self.config.validation.required_fields,
+                vat_rates=self.config.validation.vat_rates,
+                strict_mode=self.config.validation.strict_mode
             )
-        else:
-            self.anomaly_detector = None
-        
+
+        # Anomaly detector
+        if old_config is None or self.config.anomaly_detection != old_config.anomaly_detection:
+            if self.config.anomaly_detection.enabled:
+                detector_type = self.config.anomaly_detection.algorithms[0] \
+                    if self.config.anomaly_detection.algorithms else "statistical"
+                self.anomaly_detector = create_anomaly_detector(
+                    detector_type=detector_type,
+                    threshold=self.config.anomaly_detection.threshold
+                )
+            else:
+                self.anomaly_detector = None
+
         # Exporter
-        self.exporter = create_exporter(
-            formats=self.config.export.formats,
-            pretty_json=self.config.export.pretty_json
-        )
+        if old_config is None or self.config.export != old_config.export:
+            self.exporter = create_exporter(
+                formats=self.config.export.formats,
+                pretty_json=self.config.export.pretty_json
+            )
     
     def process_invoice(self, 
                        invoice_path: str,
@@ -99,7 +254,7 @@ class InvoiceExtractionPipeline:
         Returns:
             Processing results including extracted data and status
         """
-        logger.info(f"Processing invoice: {invoice_path}")
+        logger.info("Processing invoice: %s", invoice_path)
         
         result = {
             'success': False,
@@ -108,9 +263,19 @@ class InvoiceExtractionPipeline:
         }
         
         try:
-            # Stage 1: OCR text extraction
-            logger.info("Stage 1: OCR text extraction")
-            ocr_result = self.ocr_engine.extract_text(invoice_path)
+            # Stage 1: OCR text extraction, served from the disk cache
+            # when the same file content was OCR'd under the same config
+            logger.debug("Stage 1: OCR text extraction")
+            ocr_result = None
+            cache_key = None
+            if self._ocr_cache is not None:
+                cache_key = OcrDiskCache.make_key(invoice_path, self.config.ocr)
+                if cache_key is not None:
+                    ocr_result = self._ocr_cache.get(cache_key)
+            if ocr_result is None:
+                ocr_result = self.ocr_engine.extract_text(invoice_path)
+                if cache_key is not None and ocr_result['success']:
+                    self._ocr_cache.put(cache_key, ocr_result)
             result['stages']['ocr'] = {
                 'success': ocr_result['success'],
                 'text_length': len(ocr_result['text'])
@@ -121,7 +286,7 @@ class InvoiceExtractionPipeline:
                 return result
             
             # Stage 2: Field extraction
-            logger.info("Stage 2: Field extraction")
+            logger.debug("Stage 2: Field extraction")
             extracted_fields = self.field_extractor.extract_fields(
                 ocr_result['text'],
                 ocr_result['raw_data']
@@ -133,7 +298,7 @@ class InvoiceExtractionPipeline:
             result['extracted_data'] = extracted_fields
             
             # Stage 3: Data validation
-            logger.info("Stage 3: Data validation")
+            logger.debug("Stage 3: Data validation")
             validation_result = self.validator.validate(extracted_fields)
             result['stages']['validation'] = {
                 'valid': validation_result['valid'],
@@ -144,7 +309,7 @@ class InvoiceExtractionPipeline:
             
             # Stage 4: Anomaly detection
             if self.anomaly_detector:
-                logger.info("Stage 4: Anomaly detection")
+                logger.debug("Stage 4: Anomaly detection")
                 anomaly_result = self.anomaly_detector.detect_anomalies(
                     extracted_fields,
                     historical_data
@@ -155,90 +320,517 @@ class InvoiceExtractionPipeline:
                 }
                 result['anomalies'] = anomaly_result
             
-            # Stage 5: Export data
-            if output_name:
-                logger.info("Stage 5: Exporting data")
-                output_dir = Path(self.config.export.output_dir)
-                output_dir.mkdir(exist_ok=True)
-                
-                output_path = str(output_dir / output_name)
-                export_success = self.exporter.export(extracted_fields, output_path)
+            # Stages 5 and 6: export and ERP integration. Export is
+            # disk-bound and the ERP push is network-bound, so when both
+            # are requested they run concurrently and the wall time is
+            # the slower of the two rather than their sum. asyncio.run()
+            # cannot start a loop on a thread that is already running
+            # one, so when called from async code (e.g. inside a
+            # coroutine) the stages fall through to the sequential
+            # branch instead of failing the invoice.
+            if output_name and erp_adapter and not self._loop_running():
+                logger.debug("Stages 5-6: Exporting data and pushing to ERP")
+                output_path = self._prepare_output_path(output_name)
+                export_success, push_result = self._run_async(
+                    self._push_and_export(extracted_fields, erp_adapter, output_path))
                 result['stages']['export'] = {
                     'success': export_success,
                     'output_path': output_path
                 }
-            
-            # Stage 6: ERP integration (optional)
-            if erp_adapter:
-                logger.info("Stage 6: ERP integration")
-                push_result = erp_adapter.push_invoice(extracted_fields)
                 result['stages']['erp_integration'] = push_result
+            else:
+                # Stage 5: Export data
+                if output_name:
+                    logger.debug("Stage 5: Exporting data")
+                    output_path = self._prepare_output_path(output_name)
+                    export_success = self.exporter.export(extracted_fields, output_path)
+                    result['stages']['export'] = {
+                        'success': export_success,
+                        'output_path': output_path
+                    }
+
+                # Stage 6: ERP integration (optional)
+                if erp_adapter:
+                    logger.debug("Stage 6: ERP integration")
+                    push_result = erp_adapter.push_invoice(extracted_fields)
+                    result['stages']['erp_integration'] = push_result
             
             result['success'] = True
-            logger.info("Invoice processing completed successfully")
+            logger.debug("Invoice processing completed successfully")
             
         except Exception as e:
-            logger.error(f"Invoice processing failed: {e}")
+            logger.error("Invoice processing failed: %s", e)
             result['error'] = str(e)
         
         return result
-    
+
+    @staticmethod
+    def _loop_running() -> bool:
+        """Whether the calling thread already has an event loop running."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+
+    def _run_async(self, coro):
+        """
+        Drive a coroutine to completion on the pipeline's private loop.
+
+        The loop is created once and reused, so a sequential ERP batch
+        through iter_batch does not build and tear down an event loop
+        per invoice the way asyncio.run() would. Callers must check
+        _loop_running() first: a thread cannot drive a second loop
+        while one is already running on it.
+        """
+        loop = self._async_loop
+        if loop is None or loop.is_closed():
+            loop = self._async_loop = asyncio.new_event_loop()
+        return loop.run_until_complete(coro)
+
+    def _prepare_output_path(self, output_name: str) -> str:
+        """Ensure the output directory exists and build the export path."""
+        output_dir = Path(self.config.export.output_dir)
+        output_dir.mkdir(exist_ok=True)
+        return str(output_dir / output_name)
+
+    async def _push_and_export(self,
+                               data: Dict[str, Any],
+                               erp_adapter: ERPAdapter,
+                               output_path: str):
+        """Run the file export and the ERP push concurrently."""
+        return await asyncio.gather(
+            asyncio.to_thread(self.exporter.export, data, output_path),
+            erp_adapter.push_invoice_async(data)
+        )
+
     def process_batch(self,
                      invoice_paths: List[str],
                      output_dir: Optional[str] = None,
-                     erp_adapter: Optional[ERPAdapter] = None) -> Dict[str, Any]:
+                     erp_adapter: Optional[ERPAdapter] = None,
+                     num_workers: int = DEFAULT_BATCH_WORKERS,
+                     pipelined: bool = False,
+                     export_mode: str = 'per_invoice',
+                     collect_results: bool = True) -> Dict[str, Any]:
         """
         Process multiple invoices in batch.
-        
+
+        Invoices are independent, so they are dispatched to a process pool
+        when num_workers > 1. ERP pushes are deferred and run on a thread
+        pool (config.integration.max_concurrency wide) as results stream
+        back, overlapping the network round trips — so an ERP adapter no
+        longer forces sequential processing.
+
+        With pipelined=True the stages run in three threads connected by
+        bounded queues (OCR | extraction+validation | export/ERP), so the
+        I/O-heavy OCR and export stages overlap with extraction compute on
+        neighbouring invoices. This mode works with an ERP adapter.
+
+        With export_mode='batched' the per-invoice export stage is skipped
+        and all extracted invoices are written in one pass to a single
+        buffered JSONL file in output_dir, amortizing the open/close
+        syscalls across the batch.
+
+        Results stream through iter_batch; with collect_results=False only
+        the counters (and the batched export file, if requested) are kept,
+        bounding memory on very large batches.
+
         Args:
             invoice_paths: List of paths to invoice files
             output_dir: Directory for output files
             erp_adapter: Optional ERP adapter for integration
-            
+            num_workers: Number of worker processes (1 disables parallelism)
+            pipelined: Use the threaded stage pipeline instead of a pool
+            export_mode: 'per_invoice' (default) or 'batched'
+            collect_results: Keep per-invoice results in the summary
+
         Returns:
             Batch processing results
         """
-        logger.info(f"Processing batch of {len(invoice_paths)} invoices")
-        
+        logger.info("Processing batch of %d invoices", len(invoice_paths))
+
         if output_dir:
-            self.config.export.output_dir = output_dir
-        
-        results = []
+            # Config objects are frozen; swap in an updated export section
+            self.config = self.config.replace_section(
+                export=replace(self.config.export, output_dir=output_dir))
+
+        # In batched mode the workers skip per-invoice export; the batch
+        # file is written once as results stream back
+        per_invoice_dir = None if export_mode == 'batched' else output_dir
+
+        # Pipelined mode pushes from its export-stage thread; otherwise
+        # pushes are deferred to a thread pool below, which also frees
+        # iter_batch to use the process pool (the adapter never has to
+        # cross a process boundary)
+        push_via_pool = erp_adapter is not None and not pipelined
+
+        if pipelined:
+            result_iter = iter(self._process_batch_pipelined(
+                invoice_paths, per_invoice_dir, erp_adapter))
+        else:
+            result_iter = self.iter_batch(invoice_paths,
+                                          output_dir=per_invoice_dir,
+                                          erp_adapter=None,
+                                          num_workers=num_workers)
+
         successful = 0
         failed = 0
-        
-        for i, invoice_path in enumerate(invoice_paths):
-            output_name = f"invoice_{i+1}" if output_dir else None
-            
-            result = self.process_invoice(
-                invoice_path,
-                output_name=output_name,
-                erp_adapter=erp_adapter
-            )
-            
-            if result['success']:
-                successful += 1
+        results: List[Dict[str, Any]] = []
+        export_path = None
+        push_pool = None
+        push_futures: Dict[Any, Dict[str, Any]] = {}
+        if push_via_pool:
+            push_pool = ThreadPoolExecutor(
+                max_workers=self.config.integration.max_concurrency)
+
+        def counted(iterator):
+            nonlocal successful, failed
+            for result in iterator:
+                if result['success']:
+                    successful += 1
+                else:
+                    failed += 1
+                if collect_results:
+                    results.append(result)
+                # Submit the push as soon as the result arrives so the
+                # HTTP round trips overlap with remaining processing
+                if push_pool is not None and result['success'] \
+                        and 'extracted_data' in result:
+                    future = push_pool.submit(erp_adapter.push_invoice,
+                                              result['extracted_data'])
+                    push_futures[future] = result
+                yield result
+
+        try:
+            if export_mode == 'batched' and output_dir:
+                export_path = self._export_batched(counted(result_iter), output_dir)
             else:
-                failed += 1
-            
-            results.append(result)
-        
-        logger.info(f"Batch processing completed: {successful} successful, {failed} failed")
-        
+                for _ in counted(result_iter):
+                    pass
+        finally:
+            if push_pool is not None:
+                for future, result in push_futures.items():
+                    try:
+                        result['stages']['erp_integration'] = future.result()
+                    except Exception as e:
+                        logger.error("ERP push failed for %s: %s",
+                                     result['invoice_path'], e)
+                        result['stages']['erp_integration'] = {
+                            'success': False,
+                            'message': str(e)
+                        }
+                push_pool.shutdown()
+
+        logger.info("Batch processing completed: %d successful, %d failed", successful, failed)
+
+        batch_result = {
+            'total': len(invoice_paths),
+            'successful': successful,
+            'failed': failed,
+            'results': results
+        }
+
+        if export_mode == 'batched' and output_dir:
+            batch_result['export_path'] = export_path
+
+        return batch_result
+
+    def iter_batch(self,
+                   invoice_paths: List[str],
+                   output_dir: Optional[str] = None,
+                   erp_adapter: Optional[ERPAdapter] = None,
+                   num_workers: int = DEFAULT_BATCH_WORKERS) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily process invoices, yielding one result at a time.
+
+        Peak memory is bounded by the pool's in-flight window rather than
+        the whole batch, so callers can stream results to disk or an ERP
+        as they arrive. Dispatch mirrors process_batch: a process pool
+        when num_workers > 1 and no ERP adapter, sequential otherwise.
+
+        Args:
+            invoice_paths: List of paths to invoice files
+            output_dir: Directory for output files
+            erp_adapter: Optional ERP adapter for integration
+            num_workers: Number of worker processes (1 disables parallelism)
+
+        Yields:
+            Processing result for each invoice, in input order
+        """
+        if output_dir:
+            self.config = self.config.replace_section(
+                export=replace(self.config.export, output_dir=output_dir))
+
+        if erp_adapter or num_workers <= 1 or len(invoice_paths) <= 1:
+            for i, invoice_path in enumerate(invoice_paths):
+                output_name = f"invoice_{i+1}" if output_dir else None
+                yield self.process_invoice(
+                    invoice_path,
+                    output_name=output_name,
+                    erp_adapter=erp_adapter
+                )
+            return
+
+        # Each worker builds its pipeline once via the pool initializer
+        # and work is handed out in chunks so the pickling/IPC overhead
+        # amortizes across several invoices. Per-invoice failures are
+        # captured inside process_invoice, so map results arrive as
+        # ordinary result dicts.
+        config_dict = self.config.to_dict()
+        workers = min(num_workers, len(invoice_paths))
+        output_names = [f"invoice_{i+1}" if output_dir else None
+                        for i in range(len(invoice_paths))]
+        chunksize = max(1, len(invoice_paths) // (4 * workers))
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(config_dict,)) as executor:
+            yield from executor.map(_process_one, invoice_paths, output_names,
+                                    chunksize=chunksize)
+
+    def _export_batched(self,
+                        results,
+                        output_dir: str) -> Optional[str]:
+        """
+        Write all extracted invoices to one buffered JSONL file.
+
+        A single file opened with a 1 MiB buffer replaces one export call
+        (and its open/close syscalls) per invoice. Accepts any iterable
+        of results, including the lazy iter_batch stream.
+
+        Args:
+            results: Iterable of per-invoice processing results
+            output_dir: Directory for the batch file
+
+        Returns:
+            Path of the written file, or None if the write failed
+        """
+        out_dir = Path(output_dir)
+        out_dir.mkdir(exist_ok=True)
+        output_path = str(out_dir / "invoices.jsonl")
+
+        try:
+            f = open(output_path, 'wb', buffering=1 << 20)
+        except OSError as e:
+            logger.error("Batched export failed: %s", e)
+            # Still drain the stream so the invoices get processed (and
+            # counted) even when the batch file cannot be opened
+            for _ in results:
+                pass
+            return None
+
+        if orjson is not None:
+            def encode(record):
+                return orjson.dumps(record, default=str)
+        else:
+            def encode(record):
+                return json.dumps(record, default=str).encode('utf-8')
+
+        try:
+            with f:
+                for result in results:
+                    if result['success'] and 'extracted_data' in result:
+                        f.write(encode(result['extracted_data']))
+                        f.write(b'\n')
+        except OSError as e:
+            logger.error("Batched export failed: %s", e)
+            for _ in results:
+                pass
+            return None
+
+        logger.info("Batched export written to %s", output_path)
+        return output_path
+
+    async def process_batch_async(self,
+                                  invoice_paths: List[str],
+                                  erp_adapter: Optional[ERPAdapter] = None,
+                                  num_workers: int = DEFAULT_BATCH_WORKERS) -> Dict[str, Any]:
+        """
+        Process multiple invoices from async code.
+
+        Per-invoice OCR/extraction/validation runs on a thread pool via
+        run_in_executor (Tesseract releases the GIL during recognition),
+        and once extraction finishes all ERP pushes are awaited together
+        with asyncio.gather, so the batch pays roughly one network round
+        trip of latency instead of one per invoice.
+
+        Args:
+            invoice_paths: List of paths to invoice files
+            erp_adapter: Optional ERP adapter for integration
+            num_workers: Number of worker threads for processing
+
+        Returns:
+            Batch processing results
+        """
+        logger.info("Processing batch of %d invoices (async)", len(invoice_paths))
+
+        loop = asyncio.get_running_loop()
+        workers = max(1, min(num_workers, len(invoice_paths)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(await asyncio.gather(*(
+                loop.run_in_executor(executor, self.process_invoice, path)
+                for path in invoice_paths
+            )))
+
+        if erp_adapter is not None:
+            pushable = [r for r in results
+                        if r['success'] and 'extracted_data' in r]
+            push_results = await asyncio.gather(
+                *(erp_adapter.push_invoice_async(r['extracted_data'])
+                  for r in pushable),
+                return_exceptions=True)
+            for result, push_result in zip(pushable, push_results):
+                if isinstance(push_result, BaseException):
+                    logger.error("ERP push failed for %s: %s", result['invoice_path'], push_result)
+                    push_result = {'success': False, 'message': str(push_result)}
+                result['stages']['erp_integration'] = push_result
+
+        successful = sum(1 for r in results if r['success'])
+        failed = len(results) - successful
+
+        logger.info("Batch processing completed: %d successful, %d failed", successful, failed)
+
         return {
             'total': len(invoice_paths),
             'successful': successful,
             'failed': failed,
             'results': results
         }
-    
+
+    def _process_batch_pipelined(self,
+                                 invoice_paths: List[str],
+                                 output_dir: Optional[str],
+                                 erp_adapter: Optional[ERPAdapter]) -> List[Dict[str, Any]]:
+        """
+        Process invoices through three stage threads joined by bounded queues.
+
+        Stage 1 (OCR) overlaps file reads and Tesseract with Stage 2
+        (extraction/validation/anomaly) running on the previous invoice,
+        while Stage 3 (export/ERP) absorbs disk and network latency. The
+        queue maxsize provides backpressure so memory stays bounded.
+        """
+        ocr_queue: queue.Queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+        export_queue: queue.Queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(invoice_paths)
+
+        def ocr_stage():
+            # Hand the engine config.ocr.batch_size files per call so
+            # engines with a real batch path (threaded recognition,
+            # batched inference) amortize their per-call overhead
+            batch_size = max(1, self.config.ocr.batch_size)
+            i = 0
+            for start in range(0, len(invoice_paths), batch_size):
+                chunk = invoice_paths[start:start + batch_size]
+                try:
+                    chunk_results = self.ocr_engine.extract_text_batch(chunk)
+                except Exception as e:
+                    logger.error("OCR stage failed for batch at %s: %s", chunk[0], e)
+                    chunk_results = [{'text': '', 'raw_data': {},
+                                      'success': False, 'error': str(e)}
+                                     for _ in chunk]
+                for invoice_path, ocr_result in zip(chunk, chunk_results):
+                    result = {'success': False, 'invoice_path': invoice_path, 'stages': {}}
+                    result['stages']['ocr'] = {
+                        'success': ocr_result['success'],
+                        'text_length': len(ocr_result['text'])
+                    }
+                    if not ocr_result['success']:
+                        result['error'] = ocr_result.get('error', 'OCR extraction failed')
+                        ocr_result = None
+                    ocr_queue.put((i, result, ocr_result))
+                    i += 1
+            ocr_queue.put(None)
+
+        def extract_stage():
+            while True:
+                item = ocr_queue.get()
+                if item is None:
+                    break
+                i, result, ocr_result = item
+                if ocr_result is not None:
+                    try:
+                        extracted = self.field_extractor.extract_fields(
+                            ocr_result['text'],
+                            ocr_result['raw_data']
+                        )
+                        result['stages']['extraction'] = {
+                            'success': True,
+                            'fields_extracted': list(extracted.keys())
+                        }
+                        result['extracted_data'] = extracted
+
+                        validation_result = self.validator.validate(extracted)
+                        result['stages']['validation'] = {
+                            'valid': validation_result['valid'],
+                            'errors': validation_result['errors'],
+                            'warnings': validation_result['warnings']
+                        }
+                        result['validation'] = validation_result
+
+                        if self.anomaly_detector:
+                            anomaly_result = self.anomaly_detector.detect_anomalies(extracted)
+                            result['stages']['anomaly_detection'] = {
+                                'has_anomalies': anomaly_result['has_anomalies'],
+                                'total_anomalies': anomaly_result.get('total_anomalies', 0)
+                            }
+                            result['anomalies'] = anomaly_result
+
+                        result['success'] = True
+                    except Exception as e:
+                        logger.error("Extraction stage failed for %s: %s", result['invoice_path'], e)
+                        result['error'] = str(e)
+                export_queue.put((i, result))
+            export_queue.put(None)
+
+        def export_stage():
+            while True:
+                item = export_queue.get()
+                if item is None:
+                    break
+                i, result = item
+                if result['success'] and 'extracted_data' in result:
+                    try:
+                        if output_dir:
+                            out_dir = Path(self.config.export.output_dir)
+                            out_dir.mkdir(exist_ok=True)
+                            output_path = str(out_dir / f"invoice_{i+1}")
+                            export_success = self.exporter.export(
+                                result['extracted_data'], output_path)
+                            result['stages']['export'] = {
+                                'success': export_success,
+                                'output_path': output_path
+                            }
+
+                        if erp_adapter:
+                            push_result = erp_adapter.push_invoice(result['extracted_data'])
+                            result['stages']['erp_integration'] = push_result
+                    except Exception as e:
+                        logger.error("Export stage failed for %s: %s", result['invoice_path'], e)
+                        result['success'] = False
+                        result['error'] = str(e)
+                results[i] = result
+
+        threads = [
+            threading.Thread(target=ocr_stage, name="ocr-stage"),
+            threading.Thread(target=extract_stage, name="extract-stage"),
+            threading.Thread(target=export_stage, name="export-stage"),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
     def update_config(self, config: Config):
         """
-        Update pipeline configuration and reinitialize components.
-        
+        Update pipeline configuration and reinitialize the components
+        whose config section actually changed.
+
         Args:
             config: New configuration object
         """
+        old_config = self.config
         self.config = config
-        self._initialize_components()
+        self._initialize_components(old_config=old_config)
         logger.info("Pipeline configuration updated")
@@ -1,55 +1,61 @@
 """Utility functions for file operations."""
 
-from pathlib import Path
-from typing import List
+import os
+from typing import List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Supported invoice file extensions (lowercase)
+EXT_TUPLE = ('.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp')
 
-def get_supported_extensions() -> List[str]:
+
+def get_supported_extensions() -> Tuple[str, ...]:
     """
-    Get list of supported file extensions.
-    
+    Get supported file extensions.
+
     Returns:
-        List of supported extensions
+        Tuple of supported extensions
     """
-    return ['.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp']
+    return EXT_TUPLE
 
 
 def is_supported_file(file_path: str) -> bool:
     """
     Check if file is a supported invoice format.
-    
+
     Args:
         file_path: Path to the file
-        
+
     Returns:
         True if file is supported
     """
-    path = Path(file_path)
-    return path.suffix.lower() in get_supported_extensions()
+    # str.endswith takes the whole tuple in one C call; no Path object
+    # or suffix split needed
+    return file_path.lower().endswith(EXT_TUPLE)
 
 
 def find_invoices(directory: str) -> List[str]:
     """
     Find all invoice files in a directory.
-    
+
+    One os.scandir pass filters by extension case-insensitively, instead
+    of a glob traversal per extension and case variant.
+
     Args:
         directory: Directory to search
-        
+
     Returns:
-        List of invoice file paths
+        Sorted list of invoice file paths
     """
-    invoice_files = []
-    dir_path = Path(directory)
-    
-    if not dir_path.exists():
+    try:
+        with os.scandir(directory) as entries:
+            invoice_files = [
+                entry.path for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(EXT_TUPLE)
+            ]
+    except OSError:
         logger.warning(f"Directory does not exist: {directory}")
-        return invoice_files
-    
-    for ext in get_supported_extensions():
-        invoice_files.extend([str(f) for f in dir_path.glob(f"*{ext}")])
-        invoice_files.extend([str(f) for f in dir_path.glob(f"*{ext.upper()}")])
-    
+        return []
+
     return sorted(invoice_files)
@@ -1,16 +1,124 @@
 """Data validation module for invoice fields."""
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import logging
+import re
 from datetime import datetime
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # Validation constants
 CALCULATION_TOLERANCE = 0.01  # Tolerance for rounding errors in currency calculations
 VAT_RATE_TOLERANCE = 0.5  # Tolerance for VAT rate validation (percentage points)
 
+# Numeric fields shared by the validation checks
+NUMERIC_FIELDS = ('total', 'vat', 'subtotal')
+
+# Expected keys per line item; set algebra replaces per-key `in` tests.
+# The tuple keeps error-message order, the frozensets drive the checks.
+LINE_ITEM_FIELDS = ('description', 'quantity', 'unit_price', 'total')
+_LINE_ITEM_SET = frozenset(LINE_ITEM_FIELDS)
+_LINE_ITEM_CALC_SET = frozenset(('quantity', 'unit_price', 'total'))
+
+# Accepted invoice date formats, tried in order (strptime fallback)
+DATE_FORMATS = (
+    '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d',
+    '%d-%m-%Y', '%m-%d-%Y',
+    '%d %b %Y', '%d %B %Y'
+)
+
+# Fast-path dispatch: three components split by a single separator
+_DATE_RE = re.compile(r'^(\d{1,4})([-/ ])(\w{1,9})\2(\d{1,4})$')
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10,
+    'november': 11, 'december': 12,
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_invoice_date(date_str: str) -> Optional[datetime]:
+    """
+    Parse an invoice date string against the accepted formats.
+
+    The happy path avoids strptime's exception-driven format trial:
+    ISO strings go through fromisoformat, the rest are split with one
+    regex and dispatched to the datetime constructor directly (day/month
+    order matching DATE_FORMATS preference). Only exotic strings fall
+    back to the strptime ladder. Results are memoized so batches with
+    recurring date strings pay the parse once.
+
+    Args:
+        date_str: Raw date string from the invoice
+
+    Returns:
+        Parsed datetime, or None if no format matches
+    """
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        pass
+
+    match = _DATE_RE.match(date_str)
+    if match:
+        first, sep, second, third = match.group(1, 2, 3, 4)
+        try:
+            if sep == ' ':
+                # "%d %b %Y" / "%d %B %Y"
+                month = _MONTHS.get(second.lower())
+                if month and len(third) == 4:
+                    return datetime(int(third), month, int(first))
+            elif len(first) == 4 and sep == '-':
+                # "%Y-%m-%d"
+                return datetime(int(first), int(second), int(third))
+            elif len(third) == 4:
+                # "%d/%m/%Y" preferred; swap to "%m/%d/%Y" only when the
+                # day slot can't be a month and the month slot can
+                day, month = int(first), int(second)
+                if month > 12 and day <= 12:
+                    day, month = month, day
+                return datetime(int(third), month, day)
+        except ValueError:
+            pass
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _coerce_numeric(data: Dict[str, Any]):
+    """
+    Parse the shared numeric fields once for all validation checks.
+
+    Args:
+        data: Invoice data
+
+    Returns:
+        Tuple (numeric, bad): numeric maps field name to float for the
+        parseable values, bad lists the fields that failed to parse
+    """
+    numeric = {}
+    bad = []
+    for field in NUMERIC_FIELDS:
+        value = data.get(field)
+        if value is None:
+            continue
+        try:
+            numeric[field] = float(value)
+        except (ValueError, TypeError):
+            bad.append(field)
+    return numeric, bad
+
 
 class Validator(ABC):
     """Abstract base class for validators."""
@@ -41,8 +149,13 @@ class InvoiceValidator(Validator):
             vat_rates: List of valid VAT rates (percentages)
             strict_mode: If True, treat warnings as errors
         """
-        self.required_fields = required_fields
+        # Tuple: immutable, and tuple iteration is cheaper than list in
+        # the per-invoice check below
+        self.required_fields = tuple(required_fields)
         self.vat_rates = vat_rates
+        # Array form for the vectorized rate comparison; the original
+        # sequence is kept for warning messages
+        self._vat_rates_arr = np.asarray(vat_rates, dtype=np.float64)
         self.strict_mode = strict_mode
     
     def _validate_required_fields(self, data: Dict[str, Any]) -> List[str]:
@@ -55,87 +168,79 @@ class InvoiceValidator(Validator):
         Returns:
             List of error messages
         """
-        errors = []
-        for field in self.required_fields:
-            if field not in data or data[field] is None:
-                errors.append(f"Required field '{field}' is missing")
-        return errors
+        # data.get does one hash lookup where `in` + `[]` did two
+        missing = [f for f in self.required_fields if data.get(f) is None]
+        return [f"Required field '{f}' is missing" for f in missing]
     
-    def _validate_numeric_fields(self, data: Dict[str, Any]) -> List[str]:
+    def _validate_numeric_fields(self, data: Dict[str, Any],
+                                 numeric: Dict[str, float],
+                                 bad: List[str]) -> List[str]:
         """
         Validate numeric fields (total, VAT, subtotal).
-        
+
         Args:
             data: Invoice data
-            
+            numeric: Preparsed numeric fields from _coerce_numeric
+            bad: Fields that failed to parse as numbers
+
         Returns:
             List of error messages
         """
         errors = []
-        
+
         # Check if numeric fields are valid
-        for field in ['total', 'vat', 'subtotal']:
-            if field in data and data[field] is not None:
-                try:
-                    value = float(data[field])
-                    if value < 0:
-                        errors.append(f"Field '{field}' cannot be negative")
-                except (ValueError, TypeError):
-                    errors.append(f"Field '{field}' must be a number")
-        
+        for field in NUMERIC_FIELDS:
+            if field in bad:
+                errors.append(f"Field '{field}' must be a number")
+            elif field in numeric and numeric[field] < 0:
+                errors.append(f"Field '{field}' cannot be negative")
+
         # Validate relationships between fields
-        if 'subtotal' in data and 'vat' in data and 'total' in data:
-            try:
-                subtotal = float(data['subtotal'])
-                vat = float(data['vat'])
-                total = float(data['total'])
-                
-                expected_total = subtotal + vat
-                if abs(expected_total - total) > CALCULATION_TOLERANCE:  # Allow small rounding errors
-                    errors.append(
-                        f"Total mismatch: subtotal ({subtotal}) + VAT ({vat}) = {expected_total}, "
-                        f"but total is {total}"
-                    )
-            except (ValueError, TypeError):
-                pass  # Already handled above
-        
+        if all(field in numeric for field in ('subtotal', 'vat', 'total')):
+            subtotal = numeric['subtotal']
+            vat = numeric['vat']
+            total = numeric['total']
+
+            expected_total = subtotal + vat
+            if abs(expected_total - total) > CALCULATION_TOLERANCE:  # Allow small rounding errors
+                errors.append(
+                    f"Total mismatch: subtotal ({subtotal}) + VAT ({vat}) = {expected_total}, "
+                    f"but total is {total}"
+                )
+
         return errors
     
-    def _validate_vat_rate(self, data: Dict[str, Any]) -> List[str]:
+    def _validate_vat_rate(self, data: Dict[str, Any],
+                           numeric: Dict[str, float]) -> List[str]:
         """
         Validate VAT rate is within expected values.
-        
+
         Args:
             data: Invoice data
-            
+            numeric: Preparsed numeric fields from _coerce_numeric
+
         Returns:
             List of warning messages
         """
         warnings = []
-        
-        if 'vat' in data and 'subtotal' in data:
-            try:
-                vat = float(data['vat'])
-                subtotal = float(data['subtotal'])
-                
-                if subtotal > 0:
-                    vat_rate = (vat / subtotal) * 100
-                    
-                    # Check if VAT rate is close to any expected rate
-                    valid = False
-                    for expected_rate in self.vat_rates:
-                        if abs(vat_rate - expected_rate) < VAT_RATE_TOLERANCE:  # Allow tolerance
-                            valid = True
-                            break
-                    
-                    if not valid:
-                        warnings.append(
-                            f"Unusual VAT rate: {vat_rate:.2f}%. "
-                            f"Expected rates: {', '.join(f'{r}%' for r in self.vat_rates)}"
-                        )
-            except (ValueError, TypeError, ZeroDivisionError):
-                pass
-        
+
+        vat = numeric.get('vat')
+        subtotal = numeric.get('subtotal')
+
+        if vat is not None and subtotal is not None and subtotal > 0:
+            vat_rate = (vat / subtotal) * 100
+
+            # Check if VAT rate is close to any expected rate, in one
+            # vectorized comparison across all rates
+            valid = bool(np.any(
+                np.abs(self._vat_rates_arr - vat_rate) < VAT_RATE_TOLERANCE))
+
+            if not valid:
+                warnings.append(
+                    f"Unusual VAT rate: {vat_rate:.2f}%. "
+                    f"Expected rates: {', '.join(f'{r}%' for r in self.vat_rates)}"
+                )
+
         return warnings
     
     def _validate_date(self, data: Dict[str, Any]) -> List[str]:
@@ -152,22 +257,9 @@ class InvoiceValidator(Validator):
         
         if 'invoice_date' in data and data['invoice_date']:
             date_str = data['invoice_date']
-            
-            # Try to parse date
-            date_formats = [
-                '%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d',
-                '%d-%m-%Y', '%m-%d-%Y',
-                '%d %b %Y', '%d %B %Y'
-            ]
-            
-            parsed_date = None
-            for fmt in date_formats:
-                try:
-                    parsed_date = datetime.strptime(date_str, fmt)
-                    break
-                except ValueError:
-                    continue
-            
+
+            parsed_date = _parse_invoice_date(date_str)
+
             if not parsed_date:
                 warnings.append(f"Could not parse invoice date: {date_str}")
             else:
@@ -192,32 +284,60 @@ class InvoiceValidator(Validator):
             List of error messages
         """
         errors = []
-        
+
         if 'line_items' in data and data['line_items']:
+            complete = []  # (invoice index, item) pairs with all numeric fields
             for i, item in enumerate(data['line_items']):
-                # Check required fields
-                if 'description' not in item:
-                    errors.append(f"Line item {i+1}: missing description")
-                if 'quantity' not in item:
-                    errors.append(f"Line item {i+1}: missing quantity")
-                if 'unit_price' not in item:
-                    errors.append(f"Line item {i+1}: missing unit_price")
-                if 'total' not in item:
-                    errors.append(f"Line item {i+1}: missing total")
-                
-                # Validate calculations
-                if all(k in item for k in ['quantity', 'unit_price', 'total']):
-                    try:
-                        expected = item['quantity'] * item['unit_price']
-                        if abs(expected - item['total']) > CALCULATION_TOLERANCE:
-                            errors.append(
-                                f"Line item {i+1}: total mismatch "
-                                f"({item['quantity']} × {item['unit_price']} = {expected}, "
-                                f"but total is {item['total']})"
-                            )
-                    except (ValueError, TypeError):
-                        pass
-        
+                # One set difference replaces the per-key `in` tests
+                missing = _LINE_ITEM_SET - item.keys()
+                if missing:
+                    for field in LINE_ITEM_FIELDS:
+                        if field in missing:
+                            errors.append(f"Line item {i+1}: missing {field}")
+
+                if not (missing & _LINE_ITEM_CALC_SET):
+                    complete.append((i, item))
+
+            # Validate calculations for the complete items in one
+            # vectorized pass instead of per-item Python arithmetic
+            if complete:
+                try:
+                    n = len(complete)
+                    quantity = np.fromiter(
+                        (item['quantity'] for _, item in complete),
+                        dtype=np.float64, count=n)
+                    unit_price = np.fromiter(
+                        (item['unit_price'] for _, item in complete),
+                        dtype=np.float64, count=n)
+                    total = np.fromiter(
+                        (item['total'] for _, item in complete),
+                        dtype=np.float64, count=n)
+                    bad = np.abs(quantity * unit_price - total) > CALCULATION_TOLERANCE
+                    # Format from the coerced arrays: raw values may be
+                    # numeric strings that fromiter accepted but that
+                    # cannot be multiplied directly
+                    for k in np.flatnonzero(bad):
+                        i, item = complete[k]
+                        errors.append(
+                            f"Line item {i+1}: total mismatch "
+                            f"({item['quantity']} × {item['unit_price']} = {quantity[k] * unit_price[k]}, "
+                            f"but total is {item['total']})"
+                        )
+                except (ValueError, TypeError):
+                    # Dirty data (non-numeric values): fall back to the
+                    # scalar path, which skips the unparseable items
+                    for i, item in complete:
+                        try:
+                            expected = item['quantity'] * item['unit_price']
+                            if abs(expected - item['total']) > CALCULATION_TOLERANCE:
+                                errors.append(
+                                    f"Line item {i+1}: total mismatch "
+                                    f"({item['quantity']} × {item['unit_price']} = {expected}, "
+                                    f"but total is {item['total']})"
+                                )
+                        except (ValueError, TypeError):
+                            pass
+
         return errors
     
     def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -234,13 +354,32 @@ class InvoiceValidator(Validator):
         warnings = []
         
         try:
-            # Run all validations
             errors.extend(self._validate_required_fields(data))
-            errors.extend(self._validate_numeric_fields(data))
-            errors.extend(self._validate_line_items(data))
-            
-            warnings.extend(self._validate_vat_rate(data))
-            warnings.extend(self._validate_date(data))
+
+            # Fast-fail: in strict mode a missing required field already
+            # rejects the invoice, so skip the remaining checks and the
+            # cascade of spurious errors they would add (common after
+            # poor OCR)
+            if errors and self.strict_mode:
+                return {
+                    'valid': False,
+                    'errors': errors,
+                    'warnings': warnings,
+                    'data': data
+                }
+
+            # Parse the shared numeric fields once for all checks, and
+            # only run the checks whose inputs are actually present
+            numeric, bad = _coerce_numeric(data)
+            if numeric or bad:
+                errors.extend(self._validate_numeric_fields(data, numeric, bad))
+            if data.get('line_items'):
+                errors.extend(self._validate_line_items(data))
+
+            if numeric:
+                warnings.extend(self._validate_vat_rate(data, numeric))
+            if data.get('invoice_date'):
+                warnings.extend(self._validate_date(data))
             
             # In strict mode, treat warnings as errors
             if self.strict_mode:
@@ -22,11 +22,22 @@ setup(
         "Topic :: Software Development :: Libraries :: Python Modules",
         "License :: OSI Approved :: MIT License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     install_requires=requirements,
+    extras_require={
+        # Every module guards these with try/except ImportError and
+        # falls back to a stdlib or pure-Python path, so they stay out
+        # of install_requires (tesserocr in particular needs the
+        # libtesseract dev headers to build)
+        "perf": [
+            "orjson>=3.9.0",
+            "google-re2>=1.0",
+            "tesserocr>=2.6.0",
+            "aiohttp>=3.9.0",
+            "numba>=0.58.0",
+        ],
+    },
 )